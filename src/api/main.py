@@ -22,7 +22,11 @@ from src.api.routes import (
     onboarding,
     onboarding_realtime, # New import for realtime onboarding
 )
-from src.utils.logging import setup_logging, get_logger
+from src.services.http_pool import close_http_clients
+from src.services.o3_mini_client import close_o3_mini_client
+from src.services.redis_client import close_redis
+from src.services.realtime_client import close_realtime_client
+from src.utils.logging import setup_logging, stop_logging, get_logger
 
 logger = get_logger(__name__)
 
@@ -44,7 +48,12 @@ async def lifespan(app: FastAPI):
     logger.info(f"KratorAI Gemini API starting (debug={settings.debug})")
     yield
     # Shutdown
+    await close_http_clients()
+    await close_o3_mini_client()
+    await close_realtime_client()
+    await close_redis()
     logger.info("KratorAI Gemini API shutting down")
+    stop_logging()
 
 
 app = FastAPI(
@@ -55,6 +64,7 @@ app = FastAPI(
 )
 
 from src.utils.rate_limit import RateLimitMiddleware
+from src.utils.body_limit import MaxBodySizeMiddleware
 
 # Unified process endpoint
 @app.post("/process")
@@ -128,6 +138,10 @@ async def process_request(
 settings = get_settings()
 allowed_origins = settings.cors_origins.split(",") if settings.cors_origins != "*" else ["*"]
 
+# Body size limit - reject oversized uploads from Content-Length alone.
+# Registered before CORS so the 413 still carries CORS headers.
+app.add_middleware(MaxBodySizeMiddleware, max_size=settings.max_request_size)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
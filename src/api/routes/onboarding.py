@@ -16,7 +16,7 @@ class OnboardingTurnRequest(BaseModel):
 async def start_onboarding():
     """Start a new business onboarding voice session."""
     try:
-        session_id, ai_response = onboarding_service.start_session()
+        session_id, ai_response = await onboarding_service.start_session()
         return VoiceConversationResponse(
             session_id=session_id,
             ai_response=ai_response,
@@ -50,6 +50,6 @@ async def process_onboarding_turn(request: OnboardingTurnRequest):
 async def get_onboarding_session(session_id: str):
     """Get the current state of an onboarding session."""
     try:
-        return onboarding_service.get_session(session_id)
+        return await onboarding_service.get_session(session_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
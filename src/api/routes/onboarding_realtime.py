@@ -196,17 +196,15 @@ async def onboarding_realtime(websocket: WebSocket):
                                 })
                                 
                                 # 2. Provide tool response back to AI
-                                ws = realtime_client.sessions.get(session_id)
-                                if ws:
-                                    response_event = {
-                                        "type": "conversation.item.create",
-                                        "item": {
-                                            "type": "function_call_output",
-                                            "call_id": call_id,
-                                            "output": json.dumps({"status": "success"})
-                                        }
+                                response_event = {
+                                    "type": "conversation.item.create",
+                                    "item": {
+                                        "type": "function_call_output",
+                                        "call_id": call_id,
+                                        "output": json.dumps({"status": "success"})
                                     }
-                                    await ws.send(json.dumps(response_event))
+                                }
+                                await realtime_client.send_event(session_id, response_event)
                                     
                             except json.JSONDecodeError:
                                 logger.error(f"Failed to parse tool arguments: {args_str}")
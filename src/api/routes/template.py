@@ -1,6 +1,7 @@
 """Template editing endpoint."""
 
 import json
+import asyncio
 from typing import List, Optional
 from pathlib import Path
 from uuid import uuid4
@@ -15,6 +16,18 @@ from src.security.validators import validate_prompt, validate_image_upload
 
 router = APIRouter()
 
+# Bound concurrent upload reads so large batches can't exhaust file descriptors
+MAX_CONCURRENT_IMAGE_LOADS = 16
+
+
+async def _load_upload(upload: UploadFile, sem: asyncio.Semaphore) -> Image.Image:
+    """Validate and read one uploaded image."""
+    async with sem:
+        await validate_image_upload(upload)
+        content = await upload.read()
+    return Image.open(io.BytesIO(content))
+
+
 @router.post("/edit", response_model=VariationResponse, dependencies=[Depends(verify_token)])
 async def edit_template(
     template_image: UploadFile = File(...),
@@ -32,27 +45,22 @@ async def edit_template(
         data: JSON string containing aspect definitions and global prompt
     """
     try:
-        # Validate template image upload
-        await validate_image_upload(template_image)
+        # Validate and read the template and aspect images concurrently
+        sem = asyncio.Semaphore(MAX_CONCURRENT_IMAGE_LOADS)
+        template_img, *aspect_imgs = await asyncio.gather(
+            _load_upload(template_image, sem),
+            *(_load_upload(img_file, sem) for img_file in aspect_images),
+        )
         
-        # Validate aspect images
-        for aspect_img in aspect_images:
-            await validate_image_upload(aspect_img)
         # Parse data
         parsed_data = json.loads(data)
         aspects = parsed_data.get("aspects", [])
         global_prompt = parsed_data.get("globalPrompt", "")
         
-        # Read template image
-        template_content = await template_image.read()
-        template_img = Image.open(io.BytesIO(template_content))
-        
-        # Read aspect images and map by filename
-        aspect_img_map = {}
-        for img_file in aspect_images:
-            content = await img_file.read()
-            img = Image.open(io.BytesIO(content))
-            aspect_img_map[img_file.filename] = img
+        # Map aspect images by filename
+        aspect_img_map = {
+            img_file.filename: img for img_file, img in zip(aspect_images, aspect_imgs)
+        }
             
         # Build parts for Gemini
         parts = []
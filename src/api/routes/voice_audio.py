@@ -35,6 +35,7 @@ class AudioTurnRequest(BaseModel):
     session_id: str
     audio_data: str  # Base64 encoded audio
     audio_format: str = "wav"
+    transcript: Optional[str] = None  # Client-side speech-to-text, kept in history
 
 
 class AudioTurnResponse(BaseModel):
@@ -105,8 +106,9 @@ async def process_audio_turn(request: AudioTurnRequest):
     # Process the audio
     result = await audio_client.process_audio_turn(
         session_id=request.session_id,
-        audio_base64=request.audio_data,
-        audio_format=request.audio_format
+        audio=request.audio_data,
+        audio_format=request.audio_format,
+        transcript=request.transcript
     )
     
     if result.get("error"):
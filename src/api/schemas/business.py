@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 
 class BusinessProfile(BaseModel):
@@ -12,6 +12,57 @@ class BusinessProfile(BaseModel):
     social_media_handles: Optional[List[str]] = Field(default_factory=list, description="Social media handles if mentioned")
     website: Optional[str] = Field(None, description="Website URL if mentioned")
     
+    # Onboarding page fields without an equivalent above
+    team_size: Optional[str] = Field(None, description="Team size range")
+    brand_name: Optional[str] = Field(None, description="Brand name, if different from the business name")
+    logo_status: Optional[str] = Field(None, description="Whether the business has a logo")
+    palette_preference: Optional[str] = Field(None, description="Preferred color palette")
+    target_audience_tags: Optional[List[str]] = Field(default_factory=list, description="Target audience segments")
+    marketing_objective: Optional[str] = Field(None, description="Main marketing goal")
+    ideal_customer_description: Optional[str] = Field(None, description="Description of the ideal customer")
+    aesthetic_style: Optional[str] = Field(None, description="Preferred visual style")
+    
     # Metadata
     onboarding_completed: bool = Field(False, description="Whether all essential info has been collected")
     confidence_score: float = Field(0.0, description="Confidence in the collected data")
+
+
+# Structured-output schema for text onboarding turns. All fields are required
+# and extra keys forbidden so the schema is valid for strict JSON-schema mode.
+
+class OnboardingProfileFields(BaseModel):
+    """Onboarding fields captured across the four pages."""
+    model_config = ConfigDict(extra="forbid")
+    
+    company_name: str
+    industry: str
+    team_size: str
+    brand_name: str
+    voice_tone: str
+    logo_status: str
+    palette_preference: str
+    target_audience_tags: List[str]
+    marketing_objective: str
+    ideal_customer_description: str
+    aesthetic_style: str
+
+
+class OnboardingUIState(BaseModel):
+    """UI navigation and focus state for the current onboarding page."""
+    model_config = ConfigDict(extra="forbid")
+    
+    highlight_fields: List[str]
+    suggested_options: List[str]
+    page_completed: bool
+    missing_required_fields: List[str]
+
+
+class OnboardingTurnResponse(BaseModel):
+    """Model output for a single text onboarding turn."""
+    model_config = ConfigDict(extra="forbid")
+    
+    ai_message: str
+    current_page: int
+    profile: OnboardingProfileFields
+    ui_state: OnboardingUIState
+    onboarding_completed: bool
@@ -1,12 +1,18 @@
 """Configuration management for KratorAI Gemini Integration."""
 
+import os
 from functools import lru_cache
-from pydantic_settings import BaseSettings
+from typing import Optional
 
+from dotenv import dotenv_values
+from pydantic import BaseModel, ConfigDict
 
-class Settings(BaseSettings):
+
+class Settings(BaseModel):
     """Application settings loaded from environment variables."""
     
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     # Azure AI (FLUX.1)
     azure_ai_endpoint: str | None = None
     azure_ai_key: str | None = None
@@ -24,18 +30,24 @@ class Settings(BaseSettings):
     azure_openai_api_version: str = "2025-01-01-preview"  # Required for o3-mini
     openai_max_tokens: int = 2000
     openai_temperature: float = 0.0  # Deterministic reasoning
+    openai_cache_size: int = 1024  # Cached completions for opted-in call sites; 0 disables
+    openai_cache_ttl_seconds: int = 3600
     
     # Azure Realtime API (GPT-4o Realtime for voice)
     azure_realtime_endpoint: str | None = None
     azure_realtime_key: str | None = None
     azure_realtime_deployment: str = "gpt-realtime-mini"  # Your deployment name
     azure_realtime_api_version: str = "2024-10-01-preview"  # Required for realtime
+    realtime_prewarm_connections: int = 0  # idle pre-connected sockets kept ready; 0 disables
     
     # Azure Audio Preview API (GPT-4o Audio for voice - REST based)
     azure_audio_endpoint: str | None = None
     azure_audio_key: str | None = None
     azure_audio_deployment: str = "gpt-4o-audio-preview"
     azure_audio_api_version: str = "2025-01-01-preview"
+    # Speech-to-text deployment (e.g. whisper, gpt-4o-transcribe) on the same
+    # resource for keeping user turns as text; unset sends no extra request
+    azure_audio_transcription_deployment: str | None = None
     
     # Google Cloud Storage
     gcs_bucket_name: str = "kratorai-assets"
@@ -44,6 +56,9 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "postgresql+asyncpg://localhost:5432/kratorai"
     
+    # Shared cache (optional; in-process caches only when unset)
+    redis_url: str | None = None
+    
     # Security Settings
     backend_token: str = "dev-token-change-in-production"  # Default for dev, set via KRATORAI_BACKEND_TOKEN in production
     
@@ -55,6 +70,7 @@ class Settings(BaseSettings):
     # Production Settings
     request_timeout: int = 60
     max_upload_size: int = 10 * 1024 * 1024  # 10MB
+    max_request_size: int = 64 * 1024 * 1024  # 64MB, whole multipart body
     rate_limit_per_minute: int = 60
     
     # Model Settings
@@ -69,15 +85,48 @@ class Settings(BaseSettings):
     
     # Performance
     flux_timeout_seconds: int = 30
+    flux_max_input_edge: int = 1536  # longer edge; larger edit inputs are downscaled
+    flux_cache_enabled: bool = False  # reuse responses for byte-identical FLUX requests
+    flux_cache_size: int = 128
+    flux_cache_ttl_seconds: int = 24 * 60 * 60
     max_concurrent_requests: int = 5
+    vision_concurrency: int = 8  # concurrent reference-image analyses, process-wide
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"  # Ignore other extra fields if any
+    @classmethod
+    def from_env(cls, env_file: Optional[str] = ".env") -> "Settings":
+        """
+        Build settings from the process environment and an optional .env file.
+        
+        Field names are matched case-insensitively against variable names.
+        Process environment variables take precedence over the .env file.
+        """
+        values: dict[str, str] = {}
+        
+        sources = [os.environ]
+        if env_file and os.path.isfile(env_file):
+            sources.insert(0, dotenv_values(env_file, encoding="utf-8"))
+        
+        for source in sources:
+            for key, value in source.items():
+                name = key.lower()
+                if value is not None and name in cls.model_fields:
+                    values[name] = value
+        
+        return cls.model_validate(values)
+
+
+@lru_cache(maxsize=8)
+def _get_settings(pid: int) -> Settings:
+    """Build settings once per process ID."""
+    return Settings.from_env()
 
 
-@lru_cache()
 def get_settings() -> Settings:
-    """Get cached settings instance."""
-    return Settings()
+    """
+    Get cached settings instance.
+    
+    The cache is keyed on the current process ID, so worker processes forked
+    from a preloaded parent build their own instance once and pick up any
+    environment overrides applied after the fork.
+    """
+    return _get_settings(os.getpid())
@@ -1,15 +1,20 @@
 """Royalty graph for tracking design lineage and computing shares."""
 
+import json
 import networkx as nx
-from typing import Optional
+from collections import defaultdict, deque
+from typing import Iterator, Optional
 from dataclasses import dataclass
 
 from src.api.schemas import RoyaltyShare, ImageInput
 
+# Lineage paths whose share multiplier drops below this are pruned
+_EPS = 1e-9
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class DesignNode:
-    """Represents a design in the lineage graph."""
+    """Represents a design in the lineage graph (immutable record)."""
     design_id: str
     owner_id: str
     created_at: str
@@ -26,6 +31,9 @@ class RoyaltyGraph:
     
     def __init__(self):
         self.graph = nx.DiGraph()
+        # owner_id of every root (parentless) design, read directly by share
+        # propagation instead of going through the node attribute dicts
+        self._root_owners: dict[str, str] = {}
     
     def add_design(self, design_id: str, owner_id: str, is_original: bool = True) -> None:
         """Add a design node to the graph."""
@@ -34,6 +42,8 @@ class RoyaltyGraph:
             owner_id=owner_id,
             is_original=is_original,
         )
+        if owner_id and not self.graph.pred[design_id]:
+            self._root_owners[design_id] = owner_id
     
     def add_breeding_relationship(
         self,
@@ -50,6 +60,8 @@ class RoyaltyGraph:
             weight: Contribution weight of this parent (0-1)
         """
         self.graph.add_edge(parent_id, child_id, weight=weight)
+        # A bred design is no longer a root
+        self._root_owners.pop(child_id, None)
     
     def compute_shares(
         self,
@@ -68,25 +80,25 @@ class RoyaltyGraph:
         
         Returns:
             List of RoyaltyShare objects
+        
+        Raises:
+            ValueError: If parent_ids and inputs differ in length
         """
-        shares = []
+        # Hoist the node lookup out of the loop; unknown parents get a placeholder owner
+        nodes_get = self.graph.nodes.get
         
-        for parent_id, input_img in zip(parent_ids, inputs):
-            # Get owner from graph, or use placeholder
-            owner_id = self.graph.nodes.get(parent_id, {}).get("owner_id", f"owner_{parent_id}")
-            
-            # For multi-generation, we'd recursively compute shares
-            # For now, use direct weights
-            share = RoyaltyShare(
+        # For multi-generation, we'd recursively compute shares
+        # For now, use direct weights
+        return [
+            RoyaltyShare(
                 design_id=parent_id,
-                owner_id=owner_id,
+                owner_id=nodes_get(parent_id, {}).get("owner_id", f"owner_{parent_id}"),
                 share_percentage=input_img.weight * 100,
             )
-            shares.append(share)
-        
-        return shares
+            for parent_id, input_img in zip(parent_ids, inputs, strict=True)
+        ]
     
-    def compute_propagated_shares(self, design_id: str) -> dict[str, float]:
+    def compute_propagated_shares(self, design_id: str, epsilon: float = _EPS) -> dict[str, float]:
         """
         Compute propagated shares for all ancestors of a design.
         
@@ -95,51 +107,208 @@ class RoyaltyGraph:
         
         Args:
             design_id: ID of the design to trace
+            epsilon: Stop descending once a path's share multiplier falls
+                below this; pass 0.0 for exact accounting
         
         Returns:
             Dict of owner_id -> total share percentage
+        
+        Raises:
+            NetworkXError: If design_id is not in the graph
         """
-        owner_shares: dict[str, float] = {}
+        if design_id not in self.graph:
+            raise nx.NetworkXError(f"The node {design_id} is not in the graph.")
+        
+        owner_shares: dict[str, float] = defaultdict(float)
+        pred_adj = self.graph.pred
+        root_owners = self._root_owners
         
         def trace_ancestry(node_id: str, share_multiplier: float = 1.0):
             """Recursively trace ancestry and accumulate shares."""
-            predecessors = list(self.graph.predecessors(node_id))
+            if share_multiplier < epsilon:
+                # Contribution is below float relevance; prune this subtree
+                return
+            
+            # Parent -> edge data in one adjacency lookup (no per-edge lookups)
+            parents = pred_adj[node_id]
             
-            if not predecessors:
+            if not parents:
                 # This is an original design
-                owner_id = self.graph.nodes[node_id].get("owner_id")
+                owner_id = root_owners.get(node_id)
                 if owner_id:
-                    owner_shares[owner_id] = owner_shares.get(owner_id, 0) + share_multiplier
+                    owner_shares[owner_id] += share_multiplier
                 return
             
-            for pred in predecessors:
-                edge_weight = self.graph.edges[pred, node_id].get("weight", 0.5)
+            for pred, edge_data in parents.items():
+                edge_weight = edge_data.get("weight", 0.5)
                 trace_ancestry(pred, share_multiplier * edge_weight)
         
         trace_ancestry(design_id)
         
-        # Normalize to percentages
+        return self._normalize_shares(owner_shares)
+    
+    def compute_all_propagated_shares(self, design_ids: list[str]) -> dict[str, dict[str, float]]:
+        """
+        Compute exact propagated shares for many designs in one pass.
+        
+        Designs are processed in topological order and every node's owner
+        shares are built from its parents' already-computed shares, so each
+        shared ancestor is visited once. Paths are never pruned: the result
+        matches compute_propagated_shares(design_id, epsilon=0.0), and can
+        include owners that the default epsilon would drop.
+        
+        Args:
+            design_ids: IDs of the designs to trace
+        
+        Returns:
+            Dict of design_id -> (owner_id -> total share percentage)
+        
+        Raises:
+            NetworkXError: If any design_id is not in the graph
+        """
+        graph = self.graph
+        for design_id in design_ids:
+            if design_id not in graph:
+                raise nx.NetworkXError(f"The node {design_id} is not in the graph.")
+
+        pred_adj = graph.pred
+        root_owners = self._root_owners
+        
+        # Only the requested designs and their ancestors matter
+        relevant = set(design_ids)
+        for design_id in design_ids:
+            relevant.update(self.iter_ancestors(design_id))
+        
+        raw_shares: dict[str, dict[str, float]] = {}
+        for node_id in nx.topological_sort(graph.subgraph(relevant)):
+            parents = pred_adj[node_id]
+            
+            if not parents:
+                # This is an original design
+                owner_id = root_owners.get(node_id)
+                raw_shares[node_id] = {owner_id: 1.0} if owner_id else {}
+                continue
+            
+            node_shares: dict[str, float] = defaultdict(float)
+            for parent_id, edge_data in parents.items():
+                edge_weight = edge_data.get("weight", 0.5)
+                for owner_id, share in raw_shares[parent_id].items():
+                    node_shares[owner_id] += share * edge_weight
+            raw_shares[node_id] = node_shares
+        
+        return {
+            design_id: self._normalize_shares(raw_shares[design_id])
+            for design_id in design_ids
+        }
+    
+    @staticmethod
+    def _normalize_shares(owner_shares: dict[str, float]) -> dict[str, float]:
+        """Normalize raw owner shares to percentages."""
         total = sum(owner_shares.values())
         if total > 0:
-            owner_shares = {k: (v / total) * 100 for k, v in owner_shares.items()}
+            scale = 100.0 / total
+            return {k: v * scale for k, v in owner_shares.items()}
         
-        return owner_shares
+        return dict(owner_shares)
+    
+    def iter_ancestors(self, design_id: str) -> Iterator[str]:
+        """Lazily yield all ancestors of a design (breadth-first)."""
+        return self._iter_reachable(design_id, self.graph.pred)
+    
+    def iter_descendants(self, design_id: str) -> Iterator[str]:
+        """Lazily yield all descendants of a design (breadth-first)."""
+        return self._iter_reachable(design_id, self.graph.succ)
     
     def get_ancestors(self, design_id: str) -> list[str]:
         """Get all ancestors of a design."""
-        return list(nx.ancestors(self.graph, design_id))
+        return list(self.iter_ancestors(design_id))
     
     def get_descendants(self, design_id: str) -> list[str]:
         """Get all descendants of a design."""
-        return list(nx.descendants(self.graph, design_id))
+        return list(self.iter_descendants(design_id))
+    
+    def _iter_reachable(self, design_id: str, adjacency) -> Iterator[str]:
+        """Breadth-first walk over an adjacency view, excluding the start node."""
+        if design_id not in self.graph:
+            raise nx.NetworkXError(f"The node {design_id} is not in the graph.")
+        
+        seen = {design_id}
+        queue = deque(adjacency[design_id])
+        while queue:
+            node_id = queue.popleft()
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            yield node_id
+            queue.extend(adjacency[node_id])
     
     def to_dict(self) -> dict:
-        """Serialize graph to dictionary."""
-        return nx.node_link_data(self.graph)
+        """
+        Serialize graph to a node-link dictionary.
+        
+        Same shape as nx.node_link_data, built directly from the graph's node
+        and adjacency stores instead of through the generic NetworkX traversal.
+        """
+        graph = self.graph
+        return {
+            "directed": True,
+            "multigraph": False,
+            "graph": dict(graph.graph),
+            "nodes": [{**data, "id": node_id} for node_id, data in graph._node.items()],
+            "edges": [
+                {**data, "source": parent_id, "target": child_id}
+                for parent_id, children in graph._adj.items()
+                for child_id, data in children.items()
+            ],
+        }
     
     @classmethod
     def from_dict(cls, data: dict) -> "RoyaltyGraph":
-        """Deserialize graph from dictionary."""
+        """Deserialize graph from a node-link dictionary (see to_dict)."""
         instance = cls()
-        instance.graph = nx.node_link_graph(data)
+        graph = instance.graph
+        graph.graph.update(data.get("graph", {}))
+        graph.add_nodes_from(
+            (node["id"], {k: v for k, v in node.items() if k != "id"})
+            for node in data["nodes"]
+        )
+        # Older NetworkX releases wrote edges under "links"
+        links = data["edges"] if "edges" in data else data.get("links", [])
+        graph.add_edges_from(
+            (link["source"], link["target"], {k: v for k, v in link.items() if k not in ("source", "target")})
+            for link in links
+        )
+        instance._rebuild_root_owners()
+        return instance
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serialize graph to compact JSON bytes for persistence.
+        
+        Layout: {"nodes": {design_id: attrs}, "edges": [[parent, child, attrs]]}
+        """
+        graph = self.graph
+        payload = {
+            "nodes": dict(graph.nodes(data=True)),
+            "edges": [[parent, child, data] for parent, child, data in graph.edges(data=True)],
+        }
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RoyaltyGraph":
+        """Deserialize graph from bytes produced by to_bytes()."""
+        payload = json.loads(data)
+        instance = cls()
+        instance.graph.add_nodes_from(payload["nodes"].items())
+        instance.graph.add_edges_from(payload["edges"])
+        instance._rebuild_root_owners()
         return instance
+    
+    def _rebuild_root_owners(self) -> None:
+        """Recompute the root owner index after loading a whole graph."""
+        pred_adj = self.graph.pred
+        self._root_owners = {
+            node_id: owner_id
+            for node_id, owner_id in self.graph.nodes(data="owner_id")
+            if owner_id and not pred_adj[node_id]
+        }
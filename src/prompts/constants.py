@@ -0,0 +1,25 @@
+"""
+Conversation limits shared by the voice prompts and services.
+
+Kept apart from the prompt modules so services can read these values without
+importing the large prompt strings, and so the prompt text and the enforced
+limits cannot drift apart.
+"""
+
+from types import MappingProxyType
+from typing import Mapping
+
+# Maximum turns before forcing completion
+MAX_CONVERSATION_TURNS: int = 3
+
+# Maximum times to ask similar question type
+MAX_REPETITIVE_QUESTIONS: int = 2
+
+# Completeness checklist - minimum information needed for each action
+COMPLETENESS_REQUIREMENTS: Mapping[str, tuple[str, ...]] = MappingProxyType({
+    "template": ("design_type", "style"),  # At minimum need these
+    "refine": ("style",),  # At least know what direction
+    "edit": ("additional_details",),  # What to edit
+    "breed": ("style",),  # Style to combine
+    "describe": (),  # No additional info needed
+})
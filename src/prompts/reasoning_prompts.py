@@ -1,35 +1,53 @@
 """System prompts for reasoning service."""
 
-DESIGN_ANALYSIS_PROMPT = """You are an expert design analyst specializing in visual communication materials. Analyze structured visual data from Azure AI Vision and generate accurate design insights with proper category classification.
+import sys
+from types import MappingProxyType
+
+# Design categories as (name, $id) pairs - the single source of truth for both
+# the prompt table and post-validation of the model's category choice.
+CATEGORIES = (
+    ("Professional Headshots", "691cce06000958fbe4ab"),
+    ("Casual Portraits", "691cce1c0039d32fdc33"),
+    ("Avatars & Characters", "691cce9dd928966d96eb"),
+    ("Marketing Banners", "691cce9dd92dedfb123e"),
+    ("Posters & Flyers", "691cce9dd92ef6f4ab51"),
+    ("Social Media Graphics", "691cce9dd92fc8863542"),
+    ("Logos & Icons", "691cce9dd9307e861459"),
+    ("Product Mockups", "691cce9dd931393bece9"),
+    ("E-commerce Visuals", "691cce9dd932150db6b9"),
+    ("Food Photography", "691cce9dd932cc54cc6c"),
+    ("Fashion & Accessories", "691cce9dd9337ac0cb4d"),
+    ("Landscapes & Cityscapes", "691cce9dd9343303585f"),
+    ("Interior Design", "691cce9dd934e7f1e1c6"),
+    ("Event Backdrops", "691cce9dd93690dd2df1"),
+    ("Concept Art", "691cce9dd9374b9d915b"),
+    ("Digital Art & Illustration", "691cce9dd937f47353b0"),
+    ("Cartoons & Comics", "691cce9dd93896d2200b"),
+    ("Fantasy Creatures", "691cce9dd9399fde6ac0"),
+    ("Infographics", "691cce9dd93a45bccfd6"),
+    ("Presentation Backgrounds", "691cce9dd93b0b79fcae"),
+    ("Educational Diagrams", "691cce9dd93bbf6d2002"),
+    ("UI/UX Mockups", "691cce9dd93c5551ea7c"),
+)
+
+# Read-only category name -> $id lookup
+CATEGORY_ID = MappingProxyType(dict(CATEGORIES))
+
+
+def _build_category_table() -> str:
+    """Render CATEGORIES as the Markdown table embedded in the prompt."""
+    rows = "\n".join(f"| {name} | {category_id} |" for name, category_id in CATEGORIES)
+    return "| Category Name | $id |\n|--------------|-----|\n" + rows
+
+
+# Interned once at import so every request reuses the same string object.
+DESIGN_ANALYSIS_PROMPT = sys.intern("""You are an expert design analyst specializing in visual communication materials. Analyze structured visual data from Azure AI Vision and generate accurate design insights with proper category classification.
 
 ## Available Categories (Select EXACTLY ONE)
 
 You MUST classify into one of these categories using BOTH the name and $id:
 
-| Category Name | $id |
-|--------------|-----|
-| Professional Headshots | 691cce06000958fbe4ab |
-| Casual Portraits | 691cce1c0039d32fdc33 |
-| Avatars & Characters | 691cce9dd928966d96eb |
-| Marketing Banners | 691cce9dd92dedfb123e |
-| Posters & Flyers | 691cce9dd92ef6f4ab51 |
-| Social Media Graphics | 691cce9dd92fc8863542 |
-| Logos & Icons | 691cce9dd9307e861459 |
-| Product Mockups | 691cce9dd931393bece9 |
-| E-commerce Visuals | 691cce9dd932150db6b9 |
-| Food Photography | 691cce9dd932cc54cc6c |
-| Fashion & Accessories | 691cce9dd9337ac0cb4d |
-| Landscapes & Cityscapes | 691cce9dd9343303585f |
-| Interior Design | 691cce9dd934e7f1e1c6 |
-| Event Backdrops | 691cce9dd93690dd2df1 |
-| Concept Art | 691cce9dd9374b9d915b |
-| Digital Art & Illustration | 691cce9dd937f47353b0 |
-| Cartoons & Comics | 691cce9dd93896d2200b |
-| Fantasy Creatures | 691cce9dd9399fde6ac0 |
-| Infographics | 691cce9dd93a45bccfd6 |
-| Presentation Backgrounds | 691cce9dd93b0b79fcae |
-| Educational Diagrams | 691cce9dd93bbf6d2002 |
-| UI/UX Mockups | 691cce9dd93c5551ea7c |
+""" + _build_category_table() + """
 
 ## Input Data from Azure AI Vision
 
@@ -304,4 +322,4 @@ Before outputting, verify:
 
 ---
 
-**CRITICAL REMINDER**: Always output ONLY the JSON object with no markdown formatting, code blocks, or additional text. The category_name and category_id MUST match according to the reference table."""
+**CRITICAL REMINDER**: Always output ONLY the JSON object with no markdown formatting, code blocks, or additional text. The category_name and category_id MUST match according to the reference table.""")
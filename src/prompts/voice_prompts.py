@@ -4,8 +4,23 @@ Voice Conversation Prompts for o3-mini
 System prompts and templates for conversational AI voice interface.
 """
 
+import hashlib
+import itertools
+import sys
+from types import MappingProxyType
+from typing import Optional
+
+from src.prompts.constants import (
+    COMPLETENESS_REQUIREMENTS,
+    MAX_CONVERSATION_TURNS,
+    MAX_REPETITIVE_QUESTIONS,
+)
+
+# Large static system prompts are interned once at import so every request
+# hands the same string object to the completion client.
+
 # Main conversational agent system prompt
-VOICE_CONVERSATION_SYSTEM_PROMPT = """You are a helpful AI design consultant for KratorAI, assisting African creatives with their graphic design needs through natural voice conversation.
+VOICE_CONVERSATION_SYSTEM_PROMPT = sys.intern("""You are a helpful AI design consultant for KratorAI, assisting African creatives with their graphic design needs through natural voice conversation.
 
 Your role is to:
 1. Engage in friendly, natural conversation to understand what the user wants to create or edit
@@ -18,9 +33,9 @@ CONVERSATIONAL GUIDELINES:
 - Be warm, friendly, and encouraging
 - Ask ONE question at a time
 - Keep questions clear and specific
-- Vary your question phrasing - don't repeat the same question stem more than 3 times
+- Vary your question phrasing - don't repeat the same question stem more than """ + str(MAX_REPETITIVE_QUESTIONS) + """ times
 - Listen for implicit information in user responses
-- Maximum 7 conversation turns - be efficient
+- Maximum """ + str(MAX_CONVERSATION_TURNS) + """ conversation turns - be efficient
 - When you have enough core information, move to confirmation
 
 DESIGN TYPES YOU SUPPORT:
@@ -63,30 +78,27 @@ CONVERSATION FLOW:
 5. Once confirmed, you're done - the system will handle image generation
 
 IMPORTANT CONSTRAINTS:
-- Don't ask the same question type more than 3 times (e.g., "anything else?" limit: 3 times max)
+- Don't ask the same question type more than """ + str(MAX_REPETITIVE_QUESTIONS) + """ times (e.g., "anything else?" limit: """ + str(MAX_REPETITIVE_QUESTIONS) + """ times max)
 - Prioritize essential information over optional details
 - If user gives vague answers, ask for clarification instead of guessing
 - If user says "I don't know" or "your choice", use reasonable defaults and move on
-- Maximum 7 turns total - be concise
+- Maximum """ + str(MAX_CONVERSATION_TURNS) + """ turns total - be concise
 
 RESPONSE FORMAT:
 Return structured JSON with:
 {
-    "ai_message": "Your friendly conversational response/question",
-    "extracted_info": {
-        "intent": "template | refine | edit | breed | describe",
-        "design_type": "flyer | poster | social_media | etc.",
-        "style": "extracted style info",
-        "colors": ["color1", "color2"],
-        "text_content": "extracted text",
-        "additional_details": "other relevant info",
-        // ... other fields as discovered
-    },
-    "conversation_complete": false,  // true when ready for confirmation
-    "confidence": 0.8  // how confident you are in your understanding
-}
-
-    "confidence": 0.8  // how confident you are in your understanding
+  "ai_message": "Your friendly conversational response/question",
+  "extracted_info": {
+    "intent": "template | refine | edit | breed | describe",
+    "design_type": "flyer | poster | social_media | etc.",
+    "style": "extracted style info",
+    "colors": ["color1", "color2"],
+    "text_content": "extracted text",
+    "additional_details": "other relevant info",
+    // ... other fields as discovered
+  },
+  "conversation_complete": false,  // true when ready for confirmation
+  "confidence": 0.8  // how confident you are in your understanding
 }
 
 If conversation_complete is true, your ai_message should be a confirmation summary like:
@@ -97,7 +109,7 @@ TECHNICAL PROMPT GENERATION GUIDELINES:
 - However, internally you should be preparing to construct a FLUX-compatible prompt.
 - For "edit", identify if it's an "inpaint" (changing specific area), "style_transfer" (changing whole look), or "color_swap".
 - For "inpaint", try to identify the "mask_region" (e.g., "background", "shirt", "hair") if possible.
-"""
+""")
 
 EDITING_TECHNICAL_GUIDELINES = """
 FLUX.1 PROMPTING GUIDE:
@@ -109,49 +121,85 @@ FLUX.1 PROMPTING GUIDE:
 - Negative prompts are handled by the system, focus on what TO see.
 """
 
+# System prompt for o3-mini voice turns. Everything static across turns lives
+# here so the request prefix is byte-identical and the provider's automatic
+# prompt cache (OpenAI caches repeated prefixes of 1024+ tokens) hits from the
+# second turn on; only the conversation context goes in the user message.
+VOICE_CONVERSATION_TURN_SYSTEM_PROMPT = sys.intern(
+    VOICE_CONVERSATION_SYSTEM_PROMPT + "\nREFERENCE GUIDELINES:" + EDITING_TECHNICAL_GUIDELINES
+)
+
 # Template for asking the first question after initial intent
 FIRST_QUESTION_TEMPLATES = {
-    "template": [
+    "template": (
         "Great! I can help you create that. What style are you going for? (e.g., modern, traditional African, minimalist)",
         "Excellent! What kind of visual style do you have in mind?",
-        "Perfect! Tell me about the style - should it be modern, traditional with African patterns, or something else?"
-    ],
-    "refine": [
+        "Perfect! Tell me about the style - should it be modern, traditional with African patterns, or something else?",
+    ),
+    "refine": (
         "I can definitely help improve that! What would you like to enhance? The colors, the layout, or add some cultural elements?",
         "Sure thing! What specifically should I improve about this design?",
-        "Great! Should I make the colors more vibrant, add patterns, or something else?"
-    ],
-    "edit": [
+        "Great! Should I make the colors more vibrant, add patterns, or something else?",
+    ),
+    "edit": (
         "Sure! What would you like to change in this design?",
         "I can help with that. What specific edits do you need?",
-        "Got it! Tell me what you'd like to modify."
-    ]
+        "Got it! Tell me what you'd like to modify.",
+    )
 }
 
 # Question templates for gathering specific information
 QUESTION_TEMPLATES = {
-    "style": [
+    "style": (
         "What style would you like? (traditional, modern, minimalist, etc.)",
         "How about the visual style - traditional African patterns, modern design, or something else?",
-        "Which style direction appeals to you?"
-    ],
-    "colors": [
+        "Which style direction appeals to you?",
+    ),
+    "colors": (
         "What colors should I use?",
         "Do you have specific color preferences?",
-        "Which colors would work best for this?"
-    ],
-    "text_content": [
+        "Which colors would work best for this?",
+    ),
+    "text_content": (
         "What text should appear on the design? Any headlines or messages?",
         "Do you have specific text or wording you'd like to include?",
-        "What should the main message say?"
-    ],
-    "design_type": [
+        "What should the main message say?",
+    ),
+    "design_type": (
         "What type of design is this? (flyer, poster, social media post, etc.)",
         "Is this a flyer, poster, or something else?",
-        "What format do you need - flyer, social media post, or another type?"
-    ]
+        "What format do you need - flyer, social media post, or another type?",
+    )
 }
 
+# Round-robin rotation over the phrasing variants above. next() on an
+# itertools.cycle is atomic under the GIL, so threads can share these safely.
+_FIRST_QUESTION_CYCLES = {
+    intent: itertools.cycle(templates) for intent, templates in FIRST_QUESTION_TEMPLATES.items()
+}
+_QUESTION_CYCLES = {
+    field: itertools.cycle(templates) for field, templates in QUESTION_TEMPLATES.items()
+}
+
+
+def first_question(intent: str) -> Optional[str]:
+    """Return the next first-question phrasing for an intent, or None if unknown."""
+    templates = _FIRST_QUESTION_CYCLES.get(intent)
+    return next(templates) if templates else None
+
+
+def field_question(field: str) -> Optional[str]:
+    """Return the next question phrasing for a missing field, or None if unknown."""
+    templates = _QUESTION_CYCLES.get(field)
+    return next(templates) if templates else None
+
+
+def pick_question(field: str, seed: int) -> Optional[str]:
+    """Return a stable phrasing for a missing field, e.g. seeded by turn index."""
+    templates = QUESTION_TEMPLATES.get(field)
+    return templates[seed % len(templates)] if templates else None
+
+
 # Confirmation template
 CONFIRMATION_TEMPLATE = """Perfect! Let me confirm everything:
 
@@ -169,24 +217,6 @@ DEFAULT_PROMPT_TEMPLATES = {
     "template_poster": "Create a striking poster with bold visuals and clear messaging"
 }
 
-# Completeness checklist - minimum information needed for each action
-COMPLETENESS_REQUIREMENTS = {
-    "template": ["design_type", "style"],  # At minimum need these
-    "refine": ["style"],  # At least know what direction
-    "edit": ["additional_details"],  # What to edit
-    "breed": ["style"],  # Style to combine
-    "describe": []  # No additional info needed
-}
-
-# Maximum turns before forcing completion
-MAX_CONVERSATION_TURNS = 3
-
-# Maximum times to ask similar question type
-# Maximum times to ask similar question type
-MAX_REPETITIVE_QUESTIONS = 2
-
-
-# =============================================================================
 # =============================================================================
 # BUSINESS ONBOARDING PROMPTS - SPEC V2
 # =============================================================================
@@ -248,33 +278,31 @@ SMART SPELLING RULES
 - If a name is unique or local (e.g. Yoruba/African), ask for the spelling BEFORE completing the page.
 """
 
+# The JSON shape itself is enforced through the API's json_schema response
+# format (see OnboardingTurnResponse), so only field semantics are listed here.
 BUSINESS_ONBOARDING_JSON_FORMAT = """
 -----------------------------------------
-RESPONSE FORMAT (STRICT JSON for Text API)
+RESPONSE FORMAT (JSON for Text API)
 -----------------------------------------
-{
-  "ai_message": "Friendly response",
-  "current_page": 1,
-  "profile": {
-    "company_name": "", "industry": "", "team_size": "",
-    "brand_name": "", "voice_tone": "", "logo_status": "", "palette_preference": "",
-    "target_audience_tags": [], "marketing_objective": "", "ideal_customer_description": "",
-    "aesthetic_style": ""
-  },
-  "ui_state": {
-    "highlight_fields": ["next_field_to_focus"],
-    "suggested_options": ["option1", "option2"],
-    "page_completed": false,
-    "missing_required_fields": ["field1"]
-  },
-  "onboarding_completed": false
-}
+- ai_message: friendly response
+- current_page: 1-4
+- profile: every PAGE 1-4 field above ("" or [] while unknown)
+- ui_state: highlight_fields, suggested_options, page_completed, missing_required_fields (same meaning as update_onboarding_status)
+- onboarding_completed: true only when all 4 pages are done
 """
 
-BUSINESS_ONBOARDING_SYSTEM_PROMPT = BUSINESS_ONBOARDING_CORE_LOGIC + BUSINESS_ONBOARDING_JSON_FORMAT
+# Static system prompt for text onboarding turns. It must stay byte-identical
+# across calls to keep prompt-cache hits: anything volatile (greeting, profile
+# state, user text) belongs in render_onboarding_turn() instead.
+BUSINESS_ONBOARDING_SYSTEM_PROMPT = sys.intern(BUSINESS_ONBOARDING_CORE_LOGIC + BUSINESS_ONBOARDING_JSON_FORMAT)
+
+
+def render_onboarding_turn(context: str, user_text: str) -> str:
+    """Render the per-turn user message that follows the static onboarding system prompt."""
+    return f"Conversation context:\n{context}\n\nUser's latest message: {user_text}\n\nRespond with JSON."
 
 # Realtime instructions - VOICE CONTRACT
-ONBOARDING_REALTIME_INSTRUCTIONS = BUSINESS_ONBOARDING_CORE_LOGIC + """
+ONBOARDING_REALTIME_INSTRUCTIONS = sys.intern(BUSINESS_ONBOARDING_CORE_LOGIC + """
 
 -----------------------------------------
 REALTIME CONVERSATION CONSTRAINTS
@@ -283,7 +311,7 @@ REALTIME CONVERSATION CONSTRAINTS
 2. **TOOL FIRST**: Call the appropriate tool immediately as fields are discovered.
 3. **Farewell**: End with "welcome aboard KratorAI" only when ALL 4 pages are done and confirmed.
 4. If you hear noise or silence, do not respond.
-"""
+""")
 
 ONBOARDING_FIRST_GREETING = """
 Welcome to KratorAI 🚀
@@ -292,3 +320,16 @@ Let’s get your business set up.
 
 First — what’s the name of your Business?
 """
+
+
+# Short, stable identifiers for the static system prompts, computed once at
+# import. Services log them at start-up so a deploy's prompt revision can be
+# matched against prompt-cache hit rates without dumping the text.
+PROMPT_FINGERPRINTS = MappingProxyType({
+    name: hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+    for name, text in (
+        ("VOICE_CONVERSATION_TURN_SYSTEM_PROMPT", VOICE_CONVERSATION_TURN_SYSTEM_PROMPT),
+        ("BUSINESS_ONBOARDING_SYSTEM_PROMPT", BUSINESS_ONBOARDING_SYSTEM_PROMPT),
+        ("ONBOARDING_REALTIME_INSTRUCTIONS", ONBOARDING_REALTIME_INSTRUCTIONS),
+    )
+})
@@ -12,6 +12,9 @@ Usage:
         return {"message": "Access granted"}
 """
 
+import hmac
+import os
+
 from fastapi import HTTPException, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
@@ -25,33 +28,60 @@ logger = get_logger(__name__)
 # Set auto_error=False to handle missing headers manually (needed for dev bypass)
 security = HTTPBearer(auto_error=False)
 
+# Auth settings bound once per process so the per-request path is plain
+# global reads (see _load_auth_settings)
+_BACKEND_TOKEN: str = ""
+_BACKEND_TOKEN_BYTES: bytes = b""
+_DEV_BYPASS: bool = False
+
+
+def _load_auth_settings() -> None:
+    """Bind auth settings as module constants; re-run in forked worker processes."""
+    global _BACKEND_TOKEN, _BACKEND_TOKEN_BYTES, _DEV_BYPASS
+    settings = get_settings()
+    _BACKEND_TOKEN = settings.backend_token
+    _BACKEND_TOKEN_BYTES = settings.backend_token.encode("utf-8")
+    _DEV_BYPASS = settings.environment == "development" or settings.debug
+
 
-async def verify_token(
+_load_auth_settings()
+# Keep the same fork-safety as get_settings(): workers forked from a
+# preloaded parent rebind from their own settings instance
+os.register_at_fork(after_in_child=_load_auth_settings)
+
+
+async def verify_token_dev() -> str:
+    """
+    Development dependency: skip authentication without parsing the header.
+    
+    Returns:
+        The configured backend token as a dummy credential
+    """
+    return _BACKEND_TOKEN
+
+
+async def verify_token_prod(
     credentials: Optional[HTTPAuthorizationCredentials] = Security(security)
 ) -> str:
     """
     Verify Bearer token against the configured backend token.
     
     This dependency automatically:
-    - Bypasses check if environment is 'development'
-    - Returns 401 if Authorization header is missing (in prod)
+    - Returns 401 if Authorization header is missing
     - Returns 403 if token is invalid
     
+    Kept ``async``: FastAPI awaits coroutine dependencies inline on the
+    event loop, whereas a plain ``def`` would be dispatched to the threadpool.
+    
     Args:
         credentials: Automatically extracted from Authorization header
         
     Returns:
-        The validated token string (or dummy token in dev)
+        The validated token string
         
     Raises:
         HTTPException: 401/403 if authentication fails
     """
-    settings = get_settings()
-    
-    # Bypass authentication in development
-    if settings.environment == "development" or settings.debug:
-        return settings.backend_token
-        
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,7 +89,9 @@ async def verify_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if credentials.credentials != settings.backend_token:
+    # Constant-time comparison to avoid leaking the token through timing;
+    # compare as bytes so non-ASCII input cannot raise TypeError
+    if not hmac.compare_digest(credentials.credentials.encode("utf-8"), _BACKEND_TOKEN_BYTES):
         logger.warning(f"Invalid token attempt")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -67,3 +99,9 @@ async def verify_token(
         )
     
     return credentials.credentials
+
+
+# Chosen once at import, before routes capture it in Depends(); development
+# requests then skip HTTPBearer header parsing entirely. Forked workers share
+# the parent's environment, so the choice stays valid after fork.
+verify_token = verify_token_dev if _DEV_BYPASS else verify_token_prod
@@ -14,7 +14,10 @@ from src.config import get_settings
 # Constants
 MAX_PROMPT_LENGTH = 2000
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/jpg", "image/png", "image/webp", "image/gif"]
+UPLOAD_CHUNK_SIZE = 64 * 1024
+_ALLOWED_IMAGE_TYPES_ORDERED = ("image/jpeg", "image/jpg", "image/png", "image/webp", "image/gif")
+ALLOWED_IMAGE_TYPES = frozenset(_ALLOWED_IMAGE_TYPES_ORDERED)
+_INVALID_TYPE_DETAIL = f"Invalid file type. Allowed types: {', '.join(_ALLOWED_IMAGE_TYPES_ORDERED)}"
 
 
 def validate_prompt(prompt: Optional[str], required: bool = False) -> None:
@@ -34,7 +37,7 @@ def validate_prompt(prompt: Optional[str], required: bool = False) -> None:
             detail="Prompt is required"
         )
     
-    if prompt and len(prompt) > MAX_PROMPT_LENGTH:
+    if prompt is not None and len(prompt) > MAX_PROMPT_LENGTH:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Prompt exceeds maximum length of {MAX_PROMPT_LENGTH} characters"
@@ -56,28 +59,37 @@ async def validate_image_upload(file: UploadFile) -> None:
         HTTPException: 400 if validation fails
     """
     # Check content type
-    if not file.content_type or file.content_type not in ALLOWED_IMAGE_TYPES:
+    if file.content_type not in ALLOWED_IMAGE_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES)}"
+            detail=_INVALID_TYPE_DETAIL
         )
     
-    # Check file size by reading into memory
-    # Note: For very large files, consider streaming validation
-    content = await file.read()
-    file_size = len(content)
-    
-    # Reset file pointer for later reading
-    await file.seek(0)
-    
     settings = get_settings()
     max_size = settings.max_upload_size
     
-    if file_size > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File size ({file_size} bytes) exceeds maximum of {max_size} bytes"
-        )
+    # Starlette records the size while spooling the multipart body, so most
+    # uploads can be rejected without reading them back at all
+    if file.size is not None:
+        if file.size > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File size ({file.size} bytes) exceeds maximum of {max_size} bytes"
+            )
+        return
+    
+    # Otherwise stream in fixed chunks and stop as soon as the limit is passed
+    file_size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        file_size += len(chunk)
+        if file_size > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File size exceeds maximum of {max_size} bytes"
+            )
+    
+    # Reset file pointer for later reading
+    await file.seek(0)
 
 
 def validate_strength(strength: float) -> None:
@@ -4,14 +4,32 @@ Uses REST API (/chat/completions) with audio modalities.
 """
 
 import base64
-import httpx
+import re
+import asyncio
+import time
 import logging
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Union
 
 from src.config import get_settings
+from src.services.http_pool import get_http_client
 
 logger = logging.getLogger(__name__)
 
+# Session store bounds: oldest sessions are evicted past MAX_SESSIONS, and
+# sessions idle for longer than SESSION_TTL seconds are dropped
+MAX_SESSIONS = 1000
+SESSION_TTL = 30 * 60
+
+# Past user turns are kept in history as text, so each base64 clip is uploaded
+# only on its own turn instead of on every later one. The text is the caller's
+# transcript, or one from the optional transcription deployment; without
+# either, this placeholder stands in and the assistant replies carry context.
+USER_AUDIO_PLACEHOLDER = "[user replied by voice]"
+
+# Phrases in the assistant reply that mark the confirmation step
+_COMPLETE_RE = re.compile(r"should i proceed|shall i proceed|ready to generate", re.IGNORECASE)
+
 
 class AudioPreviewClient:
     """Client for Azure OpenAI GPT-4o Audio Preview model."""
@@ -33,13 +51,70 @@ class AudioPreviewClient:
             self.enabled = True
             logger.info(f"Audio Preview client initialized: {self.deployment}")
         
-        # Conversation history per session
-        self.sessions: Dict[str, list] = {}
+        # Request URLs and headers are fixed per client, so build them once
+        self._api_url = (
+            f"{self.endpoint.rstrip('/')}/openai/deployments/{self.deployment}"
+            f"/chat/completions?api-version={self.api_version}"
+            if self.enabled else ""
+        )
+        transcription_deployment = settings.azure_audio_transcription_deployment
+        self._transcription_url = (
+            f"{self.endpoint.rstrip('/')}/openai/deployments/{transcription_deployment}"
+            f"/audio/transcriptions?api-version={self.api_version}"
+            if self.enabled and transcription_deployment else ""
+        )
+        self._headers = {
+            "api-key": self.api_key,
+            "Content-Type": "application/json"
+        }
+        
+        # Conversation history per session, kept in least-recently-used order
+        # as {"messages": [...], "last_assistant": str | None,
+        # "last_used": monotonic seconds}
+        self.sessions: OrderedDict[str, dict] = OrderedDict()
+    
+    def _purge_sessions(self, now: float):
+        """Drop idle sessions and trim the store to MAX_SESSIONS."""
+        # LRU order means idle sessions are always at the front
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if now - oldest["last_used"] <= SESSION_TTL and len(self.sessions) <= MAX_SESSIONS:
+                break
+            session_id, _ = self.sessions.popitem(last=False)
+            logger.info(f"Evicted audio session: {session_id}")
+    
+    def _get_session(self, session_id: str) -> Optional[dict]:
+        """Return a live session, marking it as recently used."""
+        now = time.monotonic()
+        self._purge_sessions(now)
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        session["last_used"] = now
+        self.sessions.move_to_end(session_id)
+        return session
+    
+    async def _transcribe(self, audio: bytes, audio_format: str) -> Optional[str]:
+        """Speech-to-text for a user clip, or None if it could not be transcribed."""
+        try:
+            http = get_http_client(self.endpoint)
+            response = await http.post(
+                self._transcription_url,
+                headers={"api-key": self.api_key},
+                files={"file": (f"audio.{audio_format}", audio)},
+                data={"response_format": "json"}
+            )
+            if response.status_code != 200:
+                logger.warning(f"Transcription request failed: {response.status_code}")
+                return None
+            return (response.json().get("text") or "").strip() or None
+        except Exception as e:
+            logger.warning(f"Transcription request failed: {e}")
+            return None
     
     def _get_api_url(self) -> str:
-        """Construct API URL for chat completions."""
-        base_url = self.endpoint.rstrip('/')
-        return f"{base_url}/openai/deployments/{self.deployment}/chat/completions?api-version={self.api_version}"
+        """Return the prebuilt API URL for chat completions."""
+        return self._api_url
     
     async def create_session(self, session_id: str, system_prompt: str) -> bool:
         """Create a new conversation session."""
@@ -47,26 +122,38 @@ class AudioPreviewClient:
             logger.error("Audio Preview API not configured")
             return False
         
-        self.sessions[session_id] = [{
-            "role": "system",
-            "content": system_prompt
-        }]
+        now = time.monotonic()
+        self.sessions[session_id] = {
+            "messages": [{
+                "role": "system",
+                "content": system_prompt
+            }],
+            "last_assistant": None,
+            "last_used": now,
+        }
+        self.sessions.move_to_end(session_id)
+        self._purge_sessions(now)
         logger.info(f"Created audio session: {session_id}")
         return True
     
     async def process_audio_turn(
         self,
         session_id: str,
-        audio_base64: str,
-        audio_format: str = "wav"
+        audio: Union[bytes, str],
+        audio_format: str = "wav",
+        transcript: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Process an audio turn and get AI response with audio.
         
         Args:
             session_id: Session identifier
-            audio_base64: Base64-encoded audio data
+            audio: Raw audio bytes, or audio already base64-encoded as str
+                (as received from JSON clients), which is passed through
             audio_format: Audio format (wav, mp3, etc.)
+            transcript: Text of the audio if the caller already has it;
+                otherwise it is transcribed alongside the turn when a
+                transcription deployment is configured
             
         Returns:
             Dict with transcript, response_text, response_audio, and any errors
@@ -74,12 +161,17 @@ class AudioPreviewClient:
         if not self.enabled:
             return {"error": "Audio Preview API not configured"}
         
-        if session_id not in self.sessions:
+        session = self._get_session(session_id)
+        if session is None:
             return {"error": f"Session {session_id} not found"}
+        messages = session["messages"]
         
         try:
-            # Add user audio message to history
-            self.sessions[session_id].append({
+            # Encode only raw bytes; base64 from JSON callers goes through as-is
+            audio_base64 = base64.b64encode(audio).decode("ascii") if isinstance(audio, bytes) else audio
+            
+            # Current user audio; history keeps its transcript instead
+            user_message = {
                 "role": "user",
                 "content": [
                     {
@@ -90,17 +182,14 @@ class AudioPreviewClient:
                         }
                     }
                 ]
-            })
+            }
             
             # Prepare request
-            url = self._get_api_url()
-            headers = {
-                "api-key": self.api_key,
-                "Content-Type": "application/json"
-            }
+            url = self._api_url
+            headers = self._headers
             
             payload = {
-                "messages": self.sessions[session_id],
+                "messages": [*messages, user_message],
                 "modalities": ["text", "audio"],
                 "audio": {
                     "voice": "alloy",
@@ -113,15 +202,23 @@ class AudioPreviewClient:
             logger.info(f"Sending audio request to {url}")
             
             # Make API call
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
-                
-                if response.status_code != 200:
-                    error_text = response.text
-                    logger.error(f"Audio API error {response.status_code}: {error_text}")
-                    return {"error": f"API error: {response.status_code}"}
-                
-                data = response.json()
+            # Pooled client, so each turn reuses a warm TLS connection
+            http = get_http_client(self.endpoint)
+            if transcript is None and self._transcription_url:
+                audio_bytes = base64.b64decode(audio_base64) if isinstance(audio, str) else audio
+                response, transcript = await asyncio.gather(
+                    http.post(url, headers=headers, json=payload),
+                    self._transcribe(audio_bytes, audio_format)
+                )
+            else:
+                response = await http.post(url, headers=headers, json=payload)
+            
+            if response.status_code != 200:
+                error_text = response.text
+                logger.error(f"Audio API error {response.status_code}: {error_text}")
+                return {"error": f"API error: {response.status_code}"}
+            
+            data = response.json()
             
             # Extract response
             choice = data.get("choices", [{}])[0]
@@ -142,21 +239,24 @@ class AudioPreviewClient:
             if content and not response_text:
                 response_text = content
             
-            # Add assistant response to history (text only for future turns)
-            self.sessions[session_id].append({
+            # Add the turn to history as text; the clip itself is never resent
+            messages.append({
+                "role": "user",
+                "content": transcript or USER_AUDIO_PLACEHOLDER
+            })
+            messages.append({
                 "role": "assistant",
                 "content": response_text
             })
+            session["last_assistant"] = response_text
             
             # Check if conversation should complete
-            conversation_complete = False
-            lower_text = response_text.lower()
-            if "should i proceed" in lower_text or "shall i proceed" in lower_text or "ready to generate" in lower_text:
-                conversation_complete = True
+            conversation_complete = _COMPLETE_RE.search(response_text) is not None
             
             logger.info(f"Audio response: {response_text[:100]}...")
             
             return {
+                "transcript": transcript,
                 "response_text": response_text,
                 "response_audio": response_audio,
                 "conversation_complete": conversation_complete,
@@ -168,24 +268,11 @@ class AudioPreviewClient:
             return {"error": str(e)}
     
     def get_final_prompt(self, session_id: str) -> Optional[str]:
-        """Extract the final design prompt from conversation."""
-        if session_id not in self.sessions:
+        """Return the last assistant message as the final design prompt."""
+        session = self._get_session(session_id)
+        if session is None:
             return None
-        
-        # Combine all user and assistant messages into a summary
-        conversation_text = []
-        for msg in self.sessions[session_id]:
-            if msg.get("role") in ["user", "assistant"]:
-                content = msg.get("content", "")
-                if isinstance(content, str) and content:
-                    conversation_text.append(content)
-        
-        # Return last assistant message as the prompt
-        for msg in reversed(self.sessions[session_id]):
-            if msg.get("role") == "assistant":
-                return msg.get("content", "")
-        
-        return None
+        return session["last_assistant"]
     
     def close_session(self, session_id: str):
         """Close a conversation session."""
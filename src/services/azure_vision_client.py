@@ -4,13 +4,48 @@ Returns structured JSON only - NO human-friendly descriptions.
 """
 
 import io
+import time
 import asyncio
+from functools import lru_cache
 from typing import Optional
 from PIL import Image
 from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from azure.cognitiveservices.vision.computervision.models import VisualFeatureTypes
 from msrest.authentication import CognitiveServicesCredentials
 from src.config import get_settings
+from src.utils.image_processing import image_size_from_header
+
+
+# Simple, factual tags kept from Azure's tagger output
+BASIC_TAGS = frozenset({
+    "text", "poster", "flyer", "design", "graphic",
+    "colorful", "minimal", "professional", "modern",
+    "vintage", "abstract", "geometric", "pattern"
+})
+
+
+@lru_cache(maxsize=4)
+def _shared_cv_client(endpoint: str, key: str) -> ComputerVisionClient:
+    """Return one ComputerVisionClient per endpoint/key for the whole process.
+    
+    msrest keeps a keep-alive requests.Session per thread inside the client,
+    so sharing the client lets every to_thread worker reuse a warm connection
+    instead of each AzureVisionClient starting cold.
+    """
+    return ComputerVisionClient(endpoint, CognitiveServicesCredentials(key))
+
+
+@lru_cache(maxsize=256)
+def _url_image_size(image_url: str) -> tuple[int, int]:
+    """Download an image once per URL and return its (width, height)."""
+    import requests
+    response = requests.get(image_url, timeout=5)
+    return _image_size(response.content)
+
+
+def _image_size(data: bytes) -> tuple[int, int]:
+    """Read (width, height) from the header, falling back to PIL's lazy open."""
+    return image_size_from_header(data) or Image.open(io.BytesIO(data)).size
 
 
 class AzureVisionClient:
@@ -24,8 +59,7 @@ class AzureVisionClient:
             self.client = None
             self.enabled = False
         else:
-            credentials = CognitiveServicesCredentials(settings.azure_vision_key)
-            self.client = ComputerVisionClient(settings.azure_vision_endpoint, credentials)
+            self.client = _shared_cv_client(settings.azure_vision_endpoint, settings.azure_vision_key)
             self.enabled = True
     
     async def extract_visual_data(
@@ -65,23 +99,7 @@ class AzureVisionClient:
             }
         
         try:
-            # Get image dimensions
-            image_size, layout = self._get_image_dimensions(image_data, image_url)
-            
-            # Define features for analysis
-            features = [
-                VisualFeatureTypes.tags,
-                VisualFeatureTypes.color,
-                VisualFeatureTypes.image_type
-            ]
-            
-            # Analyze image
-            if image_url:
-                analysis = self.client.analyze_image(image_url, visual_features=features)
-            elif image_data:
-                image_stream = io.BytesIO(image_data)
-                analysis = self.client.analyze_image_in_stream(image_stream, visual_features=features)
-            else:
+            if not image_url and not image_data:
                 return {
                     "error": "No image provided",
                     "image_size": "unknown",
@@ -93,6 +111,33 @@ class AzureVisionClient:
                     "dominant_colors": []
                 }
             
+            # Define features for analysis
+            features = [
+                VisualFeatureTypes.tags,
+                VisualFeatureTypes.color,
+                VisualFeatureTypes.image_type
+            ]
+            
+            # Analyze image. The SDK is synchronous, so run it in a worker
+            # thread to keep the event loop free for other requests.
+            if image_url:
+                analyze = asyncio.to_thread(
+                    self.client.analyze_image, image_url, visual_features=features
+                )
+            else:
+                analyze = asyncio.to_thread(
+                    self.client.analyze_image_in_stream,
+                    io.BytesIO(image_data),  # fresh stream; OCR reads its own
+                    visual_features=features
+                )
+            
+            # Dimensions, analysis and OCR are independent, so run them together
+            (image_size, layout), analysis, (text_blocks, total_chars) = await asyncio.gather(
+                asyncio.to_thread(self._get_image_dimensions, image_data, image_url),
+                analyze,
+                self._extract_text_blocks(image_data, image_url),
+            )
+            
             # Extract basic visual tags (no reasoning, just facts)
             basic_tags = self._extract_basic_tags(analysis.tags) if analysis.tags else []
             
@@ -109,11 +154,8 @@ class AzureVisionClient:
                     analysis.image_type.line_drawing_type == 0
                 )
             
-            # Extract OCR text with bounding boxes
-            text_blocks = await self._extract_text_blocks(image_data, image_url)
-            
             # Calculate text density
-            text_density = self._calculate_text_density(text_blocks, image_size)
+            text_density = self._calculate_text_density(len(text_blocks), total_chars)
             
             return {
                 "image_size": image_size,
@@ -146,13 +188,9 @@ class AzureVisionClient:
         """Get image dimensions and layout orientation."""
         try:
             if image_data:
-                img = Image.open(io.BytesIO(image_data))
-                width, height = img.size
+                width, height = _image_size(image_data)
             elif image_url:
-                import requests
-                response = requests.get(image_url, timeout=5)
-                img = Image.open(io.BytesIO(response.content))
-                width, height = img.size
+                width, height = _url_image_size(image_url)
             else:
                 return "unknown", "unknown"
             
@@ -172,53 +210,48 @@ class AzureVisionClient:
     
     def _extract_basic_tags(self, tags) -> list[str]:
         """Extract only factual visual tags (no interpretation)."""
-        # Filter for high-confidence tags
-        basic_tags = []
-        for tag in tags:
-            if tag.confidence > 0.7:
-                # Only include simple, factual tags
-                tag_name = tag.name.lower()
-                if tag_name in [
-                    "text", "poster", "flyer", "design", "graphic",
-                    "colorful", "minimal", "professional", "modern",
-                    "vintage", "abstract", "geometric", "pattern"
-                ]:
-                    basic_tags.append(tag_name)
-        
-        return basic_tags[:10]  # Limit to top 10
+        # Filter for high-confidence tags, keeping only simple, factual ones
+        names = (tag.name.lower() for tag in tags if tag.confidence > 0.7)
+        return [name for name in names if name in BASIC_TAGS][:10]  # Limit to top 10
     
     async def _extract_text_blocks(
         self,
         image_data: Optional[bytes],
         image_url: Optional[str]
-    ) -> list[dict]:
-        """Extract OCR text with bounding boxes."""
+    ) -> tuple[list[dict], int]:
+        """Extract OCR text with bounding boxes, plus the total character count."""
         text_blocks = []
+        total_chars = 0
         
         try:
             # Use Read API for OCR
             if image_url:
-                read_result = self.client.read(image_url, raw=True)
+                read_result = await asyncio.to_thread(self.client.read, image_url, raw=True)
             elif image_data:
                 image_stream = io.BytesIO(image_data)
-                read_result = self.client.read_in_stream(image_stream, raw=True)
+                read_result = await asyncio.to_thread(
+                    self.client.read_in_stream, image_stream, raw=True
+                )
             else:
-                return []
+                return [], 0
             
             # Get operation location
             operation_location = read_result.headers["Operation-Location"]
             operation_id = operation_location.split("/")[-1]
             
-            # Wait for operation to complete (with timeout)
-            max_wait = 5  # 5 second max wait
-            wait_count = 0
+            # Wait for operation to complete, polling with exponential backoff
+            # (100 ms up to 1 s) so short OCR jobs return quickly
+            deadline = time.monotonic() + 10  # 10 second max wait
+            delay = 0.1
             
-            while wait_count < max_wait:
-                result = self.client.get_read_result(operation_id)
+            while True:
+                result = await asyncio.to_thread(self.client.get_read_result, operation_id)
                 if result.status.lower() not in ['notstarted', 'running']:
                     break
-                await asyncio.sleep(1)
-                wait_count += 1
+                if time.monotonic() + delay > deadline:
+                    break
+                await asyncio.sleep(delay)
+                delay = min(delay * 1.7, 1.0)
             
             # Extract text and bounding boxes
             if result.analyze_result:
@@ -238,20 +271,18 @@ class AzureVisionClient:
                                 "bounding_box": [int(x), int(y), int(width), int(height)],
                                 "confidence": 0.95  # Read API doesn't return per-line confidence
                             })
+                            total_chars += len(line.text)
         
         except Exception as e:
             print(f"OCR extraction failed: {e}")
         
-        return text_blocks
+        return text_blocks, total_chars
     
-    def _calculate_text_density(self, text_blocks: list[dict], image_size: str) -> str:
-        """Calculate text density based on number of text blocks."""
-        if not text_blocks:
+    def _calculate_text_density(self, num_blocks: int, total_chars: int) -> str:
+        """Calculate text density from the OCR block and character counts."""
+        if not num_blocks:
             return "none"
         
-        num_blocks = len(text_blocks)
-        total_chars = sum(len(block["text"]) for block in text_blocks)
-        
         # Calculate density based on character count
         if total_chars > 200 or num_blocks > 10:
             return "high"
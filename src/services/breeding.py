@@ -9,6 +9,13 @@ from src.services.flux_client import get_flux_client
 class BreedingService:
     """Service for breeding multiple designs together."""
     
+    # Fixed parts of the blend prompt
+    _BLEND_BASE = (
+        "Create a hybrid design that blends elements from multiple sources. "
+        "Combine patterns, colors, and styles into a cohesive image. "
+    )
+    _BLEND_CULTURAL = "Ensure African cultural motifs (Adinkra, Kente, etc.) are preserved and highlighted. "
+    
     def __init__(self):
         self.client = get_flux_client()
     
@@ -33,14 +40,13 @@ class BreedingService:
         # In a real scenario, we might use an image-to-image endpoint if supported
         # or just describe the blend.
         
-        blend_prompt = "Create a hybrid design that blends elements from multiple sources. "
-        blend_prompt += "Combine patterns, colors, and styles into a cohesive image. "
-        
+        parts = [self._BLEND_BASE]
         if preserve_cultural:
-            blend_prompt += "Ensure African cultural motifs (Adinkra, Kente, etc.) are preserved and highlighted. "
+            parts.append(self._BLEND_CULTURAL)
         if prompt:
-            blend_prompt += f"Also incorporate this style: {prompt}"
-            
+            parts.append(f"Also incorporate this style: {prompt}")
+        blend_prompt = "".join(parts)
+        
         # Call FLUX.1 for generation
         result = await self.client.generate_image(
             prompt=blend_prompt,
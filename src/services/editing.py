@@ -33,6 +33,13 @@ class EditingService:
         Returns:
             Edited asset with URI and metadata
         """
+        # Reject unknown edit types before paying for a FLUX round-trip
+        if edit_type not in self.SUPPORTED_EDIT_TYPES:
+            raise ValueError(
+                f"Unsupported edit type: {edit_type}. "
+                f"Supported: {', '.join(self.SUPPORTED_EDIT_TYPES)}"
+            )
+        
         # FLUX.1 supports editing via prompt and optional mask
         
         result = await self.client.edit_image(
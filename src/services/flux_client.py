@@ -3,14 +3,142 @@ FLUX.1 Client for Azure AI.
 Handles image generation requests using the FLUX.1 Kontext Pro model on Azure.
 """
 
+import io
+import copy
+import time
+import hashlib
 import httpx
 import logging
+import orjson
 import asyncio
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional, Dict, Any
+from PIL import Image, ImageOps
 from src.config import get_settings
+from src.services.http_pool import get_download_client, get_http_client
+from src.utils.retry import get_circuit_breaker, post_with_retry
+from src.utils.image_processing import image_size_from_header, resize_for_api
+
+try:
+    # SIMD base64 codec; same API as the stdlib module
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 logger = logging.getLogger(__name__)
 
+# Read size for streamed base64 encoding. A multiple of 3, so each chunk
+# encodes without padding and the pieces concatenate into one valid string.
+B64_CHUNK_SIZE = 57 * 1024
+
+
+@lru_cache(maxsize=1)
+def _gcs_client():
+    """Process-wide GCS client, created on first gs:// read."""
+    from google.cloud import storage
+    return storage.Client()
+
+
+def _downscale(data: bytes, max_edge: int) -> bytes:
+    """
+    Shrink an image so its longer edge is max_edge (blocking, CPU-bound).
+
+    Images that already fit, or that PIL cannot read, are returned unchanged.
+    """
+    try:
+        img = Image.open(io.BytesIO(data))
+    except OSError:
+        return data
+    with img:
+        if max(img.size) <= max_edge:
+            return data
+        # Re-encoding drops EXIF, so bake the Orientation tag into the pixels
+        img = ImageOps.exif_transpose(img)
+        img = resize_for_api(img, max_edge)
+        out = io.BytesIO()
+        if img.mode in ("RGBA", "LA", "P"):
+            # Keep transparency; JPEG would flatten it
+            img.save(out, format="PNG", optimize=True)
+        else:
+            img.convert("RGB").save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+class _Base64Sink:
+    """
+    Incremental base64 encoder that downsizes oversized images.
+
+    The header in the first chunk decides: images within max_edge are encoded
+    chunk by chunk, larger ones are buffered raw and shrunk in finish(). When
+    the header cannot be read the raw bytes are buffered too and PIL decides.
+    """
+
+    def __init__(self, max_edge: Optional[int] = None):
+        self.max_edge = max_edge
+        self.buffered = False
+        self._buf = bytearray()
+        self._started = False
+
+    def write(self, chunk: bytes) -> None:
+        if not self._started:
+            self._started = True
+            if self.max_edge:
+                size = image_size_from_header(chunk)
+                self.buffered = size is None or max(size) > self.max_edge
+        if self.buffered:
+            self._buf += chunk
+        else:
+            self._buf += base64.b64encode(chunk)
+
+    def finish(self) -> str:
+        if self.buffered:
+            return base64.b64encode(_downscale(bytes(self._buf), self.max_edge)).decode("ascii")
+        return self._buf.decode("ascii")
+
+
+async def _finish(sink: _Base64Sink) -> str:
+    """Finish a sink, moving the PIL work off the event loop when needed."""
+    if sink.buffered:
+        return await asyncio.to_thread(sink.finish)
+    return sink.finish()
+
+
+def _read_gcs_base64(bucket_name: str, blob_name: str, max_edge: Optional[int] = None) -> str:
+    """Stream a GCS object straight into a base64 string (blocking)."""
+    blob = _gcs_client().bucket(bucket_name).blob(blob_name)
+    sink = _Base64Sink(max_edge)
+    with blob.open("rb") as f:
+        while chunk := f.read(B64_CHUNK_SIZE):
+            sink.write(chunk)
+    return sink.finish()
+
+# Successful responses keyed by a hash of the exact request body, shared by
+# every FluxClient. Edit bodies embed the base64 image, so the key covers
+# the image content rather than its URI.
+_response_cache: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _cached_response(key: str, ttl: int) -> Optional[Dict[str, Any]]:
+    """Return a copy of a cached response, dropping it once expired."""
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, response = entry
+    if time.monotonic() - stored_at > ttl:
+        del _response_cache[key]
+        return None
+    _response_cache.move_to_end(key)
+    return copy.deepcopy(response)
+
+
+def _cache_response(key: str, response: Dict[str, Any], max_entries: int):
+    _response_cache[key] = (time.monotonic(), copy.deepcopy(response))
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > max_entries:
+        _response_cache.popitem(last=False)
+
+
 class FluxClient:
     """Client for interacting with FLUX.1 on Azure AI."""
     
@@ -20,7 +148,29 @@ class FluxClient:
         self.api_key = self.settings.azure_ai_key
         self.deployment = self.settings.azure_ai_deployment
         self.api_version = self.settings.azure_ai_api_version
+        # Shared by every FluxClient for this endpoint
+        self.breaker = get_circuit_breaker(self.endpoint)
+        
+        # Request URLs and headers are fixed per client, so build them once
+        self._generations_url = f"{self.endpoint}/images/generations?api-version={self.api_version}"
+        self._edits_url = f"{self.endpoint}/images/edits?api-version={self.api_version}"
+        self._deployment_edits_url = (
+            f"{self.endpoint}/openai/deployments/{self.deployment}"
+            f"/images/edits?api-version={self.api_version}"
+        )
+        self._headers = {
+            "Content-Type": "application/json",
+            "api-key": self.api_key,
+        }
         
+    def _cache_key(self, url: str, body: bytes) -> Optional[str]:
+        """Content hash of a request, or None when response caching is off."""
+        if not self.settings.flux_cache_enabled:
+            return None
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=32)
+        digest.update(body)
+        return digest.hexdigest()
+    
     async def generate_image(
         self,
         prompt: str,
@@ -47,7 +197,7 @@ class FluxClient:
         # However, for non-OpenAI models on Azure AI Studio (MaaS), it might differ.
         # Assuming standard Azure AI Model Inference API structure for now.
         
-        url = f"{self.endpoint}/images/generations?api-version={self.api_version}"
+        url = self._generations_url
         
         # If using the deployments path style:
         # url = f"{self.endpoint}/openai/deployments/{self.deployment}/images/generations?api-version={self.api_version}"
@@ -55,10 +205,7 @@ class FluxClient:
         # Based on typical Azure AI MaaS for FLUX:
         # It often uses the standard /images/generations path with the endpoint specific to the model.
         
-        headers = {
-            "Content-Type": "application/json",
-            "api-key": self.api_key,
-        }
+        headers = self._headers
         
         payload = {
             "prompt": prompt,
@@ -67,35 +214,47 @@ class FluxClient:
             # FLUX specific parameters might go here or in 'extra_parameters'
         }
         
-        logger.info(f"Sending request to FLUX.1: {url}")
+        body = orjson.dumps(payload)
+        cache_key = self._cache_key(url, body)
+        if cache_key is not None:
+            cached = _cached_response(cache_key, self.settings.flux_cache_ttl_seconds)
+            if cached is not None:
+                logger.info("FLUX.1 response served from cache")
+                return cached
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    url, 
-                    headers=headers, 
-                    json=payload, 
-                    timeout=60.0
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"FLUX.1 Error: {response.status_code}")
-                    logger.error(f"Response body: {response.text}")
-                    raise Exception(f"FLUX.1 API Error: {response.status_code} - {response.text}")
-                
-                response_data = response.json()
-                logger.info(f"FLUX.1 Response received with {len(response_data.get('data', []))} images")
-                logger.debug(f"Full FLUX.1 Response: {response_data}")
-                
-                # Add success flag for consistency
-                if "success" not in response_data:
-                    response_data["success"] = True
-                    
-                return response_data
+        logger.info("Sending request to FLUX.1: %s", url)
+        
+        client = get_http_client(self.endpoint)
+        try:
+            response = await post_with_retry(
+                client,
+                url, 
+                breaker=self.breaker,
+                headers=headers, 
+                content=body, 
+                timeout=60.0
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"FLUX.1 Error: {response.status_code}")
+                logger.error(f"Response body: {response.text}")
+                raise Exception(f"FLUX.1 API Error: {response.status_code} - {response.text}")
+            
+            response_data = orjson.loads(response.content)
+            logger.info("FLUX.1 Response received with %d images", len(response_data.get("data", [])))
+            
+            # Add success flag for consistency
+            if "success" not in response_data:
+                response_data["success"] = True
+            
+            if cache_key is not None:
+                _cache_response(cache_key, response_data, self.settings.flux_cache_size)
                 
-            except httpx.RequestError as e:
-                logger.error(f"Request error: {e}")
-                raise Exception(f"Failed to connect to FLUX.1 endpoint: {str(e)}")
+            return response_data
+            
+        except httpx.RequestError as e:
+            logger.error(f"Request error: {e}")
+            raise Exception(f"Failed to connect to FLUX.1 endpoint: {str(e)}")
 
     async def edit_image(
         self,
@@ -111,26 +270,31 @@ class FluxClient:
         # For now, implementing a placeholder that attempts the standard edit endpoint.
         
         # Try standard MaaS endpoint first
-        url = f"{self.endpoint}/images/edits?api-version={self.api_version}"
+        url = self._edits_url
         
-        headers = {
-            "Content-Type": "application/json",
-            "api-key": self.api_key,
-        }
+        headers = self._headers
         
+        # Downscaling a masked edit would misalign image and mask, so only
+        # shrink the source when it is edited without one.
+        max_edge = None if mask_url else self.settings.flux_max_input_edge
+
         # Helper to get base64 image data
-        async def get_image_data(image_input: str) -> str:
-            logger.info(f"Processing image input: {image_input[:100]}...")
+        async def get_image_data(image_input: str, max_edge: Optional[int] = None) -> str:
+            logger.info("Processing image input: %.100s...", image_input)
             if image_input.startswith("http"):
-                async with httpx.AsyncClient() as client:
-                    resp = await client.get(image_input)
-                    if resp.status_code == 200:
-                        import base64
-                        encoded = base64.b64encode(resp.content).decode("utf-8")
-                        logger.info(f"Encoded image from URL. Length: {len(encoded)}")
-                        return encoded
-                    raise Exception(f"Failed to download image from {image_input}")
-            
+                # One shared client for every user-supplied origin
+                client = get_download_client()
+                # Encode while streaming so the raw body is never held whole
+                async with client.stream("GET", image_input) as resp:
+                    if resp.status_code != 200:
+                        raise Exception(f"Failed to download image from {image_input}")
+                    sink = _Base64Sink(max_edge)
+                    async for chunk in resp.aiter_bytes(B64_CHUNK_SIZE):
+                        sink.write(chunk)
+                encoded = await _finish(sink)
+                logger.info("Encoded image from URL. Length: %d", len(encoded))
+                return encoded
+
             # Check if it's a data URI and strip header if needed
             if image_input.startswith("data:image"):
                 logger.info("Input is a Data URI, stripping header...")
@@ -138,39 +302,58 @@ class FluxClient:
                 
             # Check if it looks like a file path
             if image_input.startswith("/") or image_input.startswith("file://"):
-                logger.info(f"Reading local file: {image_input}")
+                logger.info("Reading local file: %s", image_input)
                 file_path = image_input.replace("file://", "")
                 try:
                     import aiofiles
-                    import base64
+                    sink = _Base64Sink(max_edge)
                     async with aiofiles.open(file_path, "rb") as f:
-                        content = await f.read()
-                        encoded = base64.b64encode(content).decode("utf-8")
-                        logger.info(f"Encoded local file. Length: {len(encoded)}")
-                        return encoded
+                        while chunk := await f.read(B64_CHUNK_SIZE):
+                            sink.write(chunk)
+                    encoded = await _finish(sink)
+                    logger.info("Encoded local file. Length: %d", len(encoded))
+                    return encoded
                 except ImportError:
                     # Fallback if aiofiles not installed
-                    import base64
+                    sink = _Base64Sink(max_edge)
                     with open(file_path, "rb") as f:
-                        content = f.read()
-                        encoded = base64.b64encode(content).decode("utf-8")
-                        logger.info(f"Encoded local file (sync). Length: {len(encoded)}")
-                        return encoded
+                        while chunk := f.read(B64_CHUNK_SIZE):
+                            sink.write(chunk)
+                    encoded = await _finish(sink)
+                    logger.info("Encoded local file (sync). Length: %d", len(encoded))
+                    return encoded
                 except Exception as e:
                     logger.error(f"Failed to read local file: {e}")
                     raise Exception(f"Failed to read local file {image_input}: {e}")
             
-            # Check if it's a gs:// URI (not supported directly here yet)
+            # Read gs:// objects from GCS in a worker thread (the SDK is blocking)
             if image_input.startswith("gs://"):
-                logger.warning(f"gs:// URIs not supported for direct upload: {image_input}")
-                raise Exception(f"gs:// URIs not supported. Please provide a URL or local path.")
+                logger.info("Reading GCS object: %s", image_input)
+                bucket_name, _, blob_name = image_input[len("gs://"):].partition("/")
+                try:
+                    encoded = await asyncio.to_thread(
+                        _read_gcs_base64, bucket_name, blob_name, max_edge
+                    )
+                except ImportError:
+                    raise Exception("gs:// URIs require google-cloud-storage to be installed")
+                except Exception as e:
+                    logger.error(f"Failed to read GCS object: {e}")
+                    raise Exception(f"Failed to read GCS object {image_input}: {e}")
+                logger.info("Encoded GCS object. Length: %d", len(encoded))
+                return encoded
             
-            logger.info(f"Assuming input is raw base64. Length: {len(image_input)}")
+            logger.info("Assuming input is raw base64. Length: %d", len(image_input))
             return image_input 
             
         try:
-            image_data = await get_image_data(image_url)
-            logger.info(f"Final image_data preview: {image_data[:50]}...")
+            # Image and mask are independent downloads/reads, so fetch together
+            if mask_url:
+                image_data, mask_data = await asyncio.gather(
+                    get_image_data(image_url), get_image_data(mask_url)
+                )
+            else:
+                image_data, mask_data = await get_image_data(image_url, max_edge), None
+            logger.info("Final image_data preview: %.50s...", image_data)
             
             payload = {
                 "image": image_data, 
@@ -178,8 +361,8 @@ class FluxClient:
                 "n": 1,
             }
             
-            if mask_url:
-                payload["mask"] = await get_image_data(mask_url)
+            if mask_data is not None:
+                payload["mask"] = mask_data
                 
         except Exception as e:
              return {
@@ -188,71 +371,86 @@ class FluxClient:
                 "data": []
             }
             
-        async with httpx.AsyncClient() as client:
-            try:
-                logger.info(f"Attempting edit at: {url}")
-                logger.info(f"Request payload keys: {list(payload.keys())}")
-                logger.info(f"Prompt: {prompt}")
+        client = get_http_client(self.endpoint)
+        try:
+            logger.info("Attempting edit at: %s", url)
+            logger.info("Request payload keys: %s", list(payload))
+            logger.info("Prompt: %s", prompt)
+            
+            # Serialized once; the fallback below resends the same body
+            body = orjson.dumps(payload)
+            cache_key = self._cache_key(url, body)
+            if cache_key is not None:
+                cached = _cached_response(cache_key, self.settings.flux_cache_ttl_seconds)
+                if cached is not None:
+                    logger.info("FLUX.1 edit response served from cache")
+                    return cached
+            
+            response = await post_with_retry(
+                client,
+                url,
+                breaker=self.breaker,
+                headers=headers,
+                content=body,
+                timeout=60.0
+            )
+            
+            if response.status_code == 404:
+                # Try fallback to deployment-specific path
+                logger.warning("Standard endpoint 404, trying deployment path...")
+                url = self._deployment_edits_url
+                logger.info("Attempting edit at: %s", url)
                 
-                response = await client.post(
+                response = await post_with_retry(
+                    client,
                     url,
+                    breaker=self.breaker,
                     headers=headers,
-                    json=payload,
+                    content=body,
                     timeout=60.0
                 )
-                
+             
+            if response.status_code != 200:
+                logger.error(f"FLUX.1 Edit Error: {response.status_code}")
+                logger.error(f"Response body: {response.text}")
+                # If still 404, it likely means editing is not supported
                 if response.status_code == 404:
-                    # Try fallback to deployment-specific path
-                    logger.warning("Standard endpoint 404, trying deployment path...")
-                    url = f"{self.endpoint}/openai/deployments/{self.deployment}/images/edits?api-version={self.api_version}"
-                    logger.info(f"Attempting edit at: {url}")
-                    
-                    response = await client.post(
-                        url,
-                        headers=headers,
-                        json=payload,
-                        timeout=60.0
-                    )
-                 
-                if response.status_code != 200:
-                    logger.error(f"FLUX.1 Edit Error: {response.status_code}")
-                    logger.error(f"Response body: {response.text}")
-                    # If still 404, it likely means editing is not supported
-                    if response.status_code == 404:
-                        return {
-                            "success": False, 
-                            "error": "Image editing is not supported by this model endpoint.",
-                            "data": []
-                        }
                     return {
-                        "success": False,
-                        "error": f"FLUX.1 Edit API Error: {response.status_code} - {response.text}",
+                        "success": False, 
+                        "error": "Image editing is not supported by this model endpoint.",
                         "data": []
                     }
-                    
-                response_data = response.json()
-                logger.info(f"FLUX.1 Edit Response received")
-                logger.debug(f"Full FLUX.1 Edit Response: {response_data}")
-                
-                # Add success flag for consistency
-                if "success" not in response_data:
-                    response_data["success"] = True
-                    
-                return response_data
-            except httpx.RequestError as e:
-                logger.error(f"Request error during edit: {e}")
-                return {
-                    "success": False,
-                    "error": f"Network error: {str(e)}",
-                    "data": []
-                }
-            except Exception as e:
-                logger.error(f"Edit failed: {e}")
                 return {
                     "success": False,
-                    "error": str(e),
+                    "error": f"FLUX.1 Edit API Error: {response.status_code} - {response.text}",
                     "data": []
                 }
+                
+            response_data = orjson.loads(response.content)
+            logger.info("FLUX.1 Edit Response received")
+            
+            # Add success flag for consistency
+            if "success" not in response_data:
+                response_data["success"] = True
+            
+            if cache_key is not None:
+                _cache_response(cache_key, response_data, self.settings.flux_cache_size)
+                
+            return response_data
+        except httpx.RequestError as e:
+            logger.error(f"Request error during edit: {e}")
+            return {
+                "success": False,
+                "error": f"Network error: {str(e)}",
+                "data": []
+            }
+        except Exception as e:
+            logger.error(f"Edit failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "data": []
+            }
 
 # Singleton
 _flux_client: Optional[FluxClient] = None
@@ -0,0 +1,61 @@
+"""Process-wide pool of shared httpx.AsyncClient instances.
+
+Service clients borrow a pooled client per configured upstream base URL
+instead of opening their own, so keep-alive connections and TLS sessions are
+reused across every caller of the same endpoint. Downloads from user-supplied
+URLs share one separate client, so arbitrary origins never add clients. The
+FastAPI lifespan closes them all.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_download_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient for an upstream base URL, creating it on first use.
+    
+    Only for fixed, configured endpoints: the pool is keyed by base URL and
+    never evicts. Use get_download_client() for user-supplied URLs.
+    """
+    key = base_url.rstrip("/")
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=100),
+        )
+        _clients[key] = client
+        logger.info(f"Created pooled HTTP client for {key}")
+    return client
+
+
+def get_download_client() -> httpx.AsyncClient:
+    """Return the single client for fetching user-supplied URLs from any origin."""
+    global _download_client
+    if _download_client is None or _download_client.is_closed:
+        # httpx's default 5s timeout; a slow image host should fail fast
+        _download_client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=100),
+        )
+    return _download_client
+
+
+async def close_http_clients():
+    """Close every pooled client; called from the application shutdown."""
+    global _download_client
+    clients = list(_clients.values())
+    _clients.clear()
+    if _download_client is not None:
+        clients.append(_download_client)
+        _download_client = None
+    for client in clients:
+        await client.aclose()
@@ -7,10 +7,21 @@ Uses Azure Chat Completions API:
 - Messages format (not prompt)
 """
 
-import json
+import copy
+import time
+import hashlib
+import logging
+from collections import OrderedDict
 from typing import Optional
-from openai import AzureOpenAI
+import orjson
+from openai import AsyncAzureOpenAI
 from src.config import get_settings
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Redis key namespace for shared completions
+COMPLETION_CACHE_PREFIX = "kratorai:o3:v1:"
 
 
 class O3MiniClient:
@@ -24,8 +35,8 @@ class O3MiniClient:
             self.client = None
             self.enabled = False
         else:
-            # Azure OpenAI client with proper endpoint and API version
-            self.client = AzureOpenAI(
+            # Async client, so reasoning latency never blocks the event loop
+            self.client = AsyncAzureOpenAI(
                 azure_endpoint=settings.azure_openai_endpoint,
                 api_key=settings.azure_openai_key,
                 api_version=settings.azure_openai_api_version  # 2025-01-01-preview
@@ -34,12 +45,89 @@ class O3MiniClient:
             self.max_tokens = settings.openai_max_tokens
             self.temperature = settings.openai_temperature  # 0.0 for deterministic
             self.enabled = True
+        
+        # LRU of (stored_at, parsed completion) for call sites that pass
+        # cache=True; backed by Redis when REDIS_URL is set. o3-mini takes no
+        # sampling parameters and is not deterministic, so a hit replays one
+        # earlier sample of the answer for the whole TTL, to every user and
+        # worker sending the same prompt.
+        self._cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._cache_size = settings.openai_cache_size
+        self._cache_ttl = settings.openai_cache_ttl_seconds
+    
+    def _cache_key(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: Optional[dict]
+    ) -> Optional[str]:
+        """Content hash for a request, or None when the cache is disabled."""
+        if self._cache_size <= 0:
+            return None
+        material = "\x00".join(
+            (self.deployment, system_prompt, user_prompt, str(response_format))
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+    
+    async def _cache_get(self, key: str) -> Optional[dict]:
+        """Look up a completion locally, then in Redis."""
+        entry = self._cache.get(key)
+        if entry is not None:
+            stored_at, result = entry
+            if time.monotonic() - stored_at <= self._cache_ttl:
+                self._cache.move_to_end(key)
+                # Callers may mutate the result, so hand out a copy
+                return copy.deepcopy(result)
+            del self._cache[key]
+        
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(COMPLETION_CACHE_PREFIX + key)
+        except Exception as e:
+            logger.warning(f"Completion cache Redis read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        try:
+            result = orjson.loads(raw)
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Completion cache Redis entry unreadable: {e}")
+            try:
+                await redis.delete(COMPLETION_CACHE_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"Completion cache Redis delete failed: {e}")
+            return None
+        self._cache_put_local(key, result)
+        return result
+    
+    async def _cache_set(self, key: str, result: dict):
+        self._cache_put_local(key, result)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.setex(COMPLETION_CACHE_PREFIX + key, self._cache_ttl, orjson.dumps(result))
+            except Exception as e:
+                logger.warning(f"Completion cache Redis write failed: {e}")
+    
+    def _cache_put_local(self, key: str, result: dict):
+        self._cache[key] = (time.monotonic(), copy.deepcopy(result))
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+    
+    async def aclose(self):
+        """Close the underlying HTTP connection pool."""
+        if self.client is not None:
+            await self.client.close()
     
     async def generate_completion(
         self,
         system_prompt: str,
         user_prompt: str,
-        response_format: Optional[dict] = None
+        response_format: Optional[dict] = None,
+        cache: bool = False
     ) -> dict:
         """
         Generate a completion using Azure OpenAI o3-mini.
@@ -49,7 +137,11 @@ class O3MiniClient:
         Args:
             system_prompt: System instruction
             user_prompt: User message (structured text/JSON, no images)
-            response_format: Optional JSON schema for structured output
+            response_format: Optional response format; {"type": "json_object"}
+                for JSON mode or {"type": "json_schema", ...} for structured output
+            cache: Reuse an earlier completion for an identical request. Only
+                for call sites where one sample of the answer is good enough;
+                never for conversations
             
         Returns:
             Parsed JSON response or error dict
@@ -59,8 +151,16 @@ class O3MiniClient:
                 "error": "Azure OpenAI is not configured. Please add AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_KEY to your .env file."
             }
         
+        cache_key = self._cache_key(system_prompt, user_prompt, response_format) if cache else None
+        if cache_key is not None:
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             # Messages format (required for Chat Completions API)
+            # The system prompt goes first and unchanged: Azure OpenAI caches
+            # repeated prompt prefixes (1024+ tokens) automatically
             messages = [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}  # Text-only, no images
@@ -73,14 +173,28 @@ class O3MiniClient:
                 "max_completion_tokens": self.max_tokens
             }
             
-            # Add JSON mode if response format specified
+            # Add JSON mode / structured output if response format specified
             if response_format:
-                request_kwargs["response_format"] = {"type": "json_object"}
+                if response_format.get("type") == "json_schema":
+                    request_kwargs["response_format"] = response_format
+                else:
+                    request_kwargs["response_format"] = {"type": "json_object"}
             
             # Call Azure Chat Completions API
             # Endpoint: /openai/deployments/{deployment}/chat/completions
             # API Version: 2025-01-01-preview
-            response = self.client.chat.completions.create(**request_kwargs)
+            response = await self.client.chat.completions.create(**request_kwargs)
+            
+            # Report prompt-cache hits for the static system prefix
+            usage = getattr(response, "usage", None)
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", None)
+            if cached_tokens is not None:
+                logger.debug(
+                    "o3-mini prompt tokens: %s (cached: %s)",
+                    usage.prompt_tokens,
+                    cached_tokens,
+                )
             
             # Extract content
             content = response.choices[0].message.content
@@ -88,14 +202,19 @@ class O3MiniClient:
             # Parse JSON if requested
             if response_format:
                 try:
-                    return json.loads(content)
-                except json.JSONDecodeError as e:
+                    result = orjson.loads(content)
+                except orjson.JSONDecodeError as e:
                     return {
                         "error": f"Failed to parse JSON response: {e}",
                         "raw_content": content
                     }
+            else:
+                result = {"content": content}
+            
+            if cache_key is not None and isinstance(result, dict):
+                await self._cache_set(cache_key, result)
             
-            return {"content": content}
+            return result
             
         except Exception as e:
             print(f"Azure OpenAI o3-mini error: {e}")
@@ -111,3 +230,11 @@ def get_o3_mini_client() -> O3MiniClient:
     if _o3_mini_client is None:
         _o3_mini_client = O3MiniClient()
     return _o3_mini_client
+
+
+async def close_o3_mini_client():
+    """Close the singleton client; called from the application shutdown."""
+    global _o3_mini_client
+    if _o3_mini_client is not None:
+        await _o3_mini_client.aclose()
+        _o3_mini_client = None
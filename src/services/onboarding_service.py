@@ -1,16 +1,52 @@
+import time
 import uuid
-from typing import Dict, Tuple, Optional
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
-from src.services.o3_mini_client import O3MiniClient
-from src.api.schemas.business import BusinessProfile
+from src.services.o3_mini_client import get_o3_mini_client
+from src.services.redis_client import get_redis
+from src.api.schemas.business import BusinessProfile, OnboardingTurnResponse
 from src.api.schemas.voice import ConversationMessage, AIResponse
-from src.prompts.voice_prompts import BUSINESS_ONBOARDING_SYSTEM_PROMPT, ONBOARDING_FIRST_GREETING
+from src.prompts.voice_prompts import (
+    BUSINESS_ONBOARDING_SYSTEM_PROMPT,
+    ONBOARDING_FIRST_GREETING,
+    PROMPT_FINGERPRINTS,
+    render_onboarding_turn,
+)
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Structured-output constraint for onboarding turns; replaces the JSON example
+# that used to be spelled out in the system prompt
+ONBOARDING_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "onboarding_turn",
+        "strict": True,
+        "schema": OnboardingTurnResponse.model_json_schema(),
+    },
+}
+
+# Onboarding page fields stored under a differently named BusinessProfile
+# field; every other page field has a field of its own name
+PROFILE_FIELD_ALIASES = {
+    "company_name": "business_name",
+    "voice_tone": "brand_voice",
+}
+
+# History kept per session; turns only ever read the last 8 messages
+MAX_SESSION_MESSAGES = 64
+
+# Session store bounds; idle sessions expire after SESSION_TTL seconds
+MAX_SESSIONS = 10_000
+SESSION_TTL = 60 * 60
+# Bump the version whenever OnboardingSession or its nested models change
+SESSION_KEY_PREFIX = "kratorai:onb:v1:"
+
 class OnboardingSession(BaseModel):
     session_id: str
     messages: list[ConversationMessage] = Field(default_factory=list)
@@ -18,93 +54,209 @@ class OnboardingSession(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     turn_count: int = 0
     is_complete: bool = False
+    _last_used: float = PrivateAttr(default_factory=time.monotonic)
+
+    def add_message(self, message: ConversationMessage):
+        """Append a message, dropping the oldest once past MAX_SESSION_MESSAGES."""
+        self.messages.append(message)
+        if len(self.messages) > MAX_SESSION_MESSAGES:
+            del self.messages[:-MAX_SESSION_MESSAGES]
 
 class OnboardingService:
     def __init__(self):
-        self.o3_client = O3MiniClient()
-        self.sessions: Dict[str, OnboardingSession] = {}
+        self.o3_client = get_o3_mini_client()
+        # LRU of live sessions; with REDIS_URL set, Redis is the shared source of truth
+        self.sessions: OrderedDict[str, OnboardingSession] = OrderedDict()
+        logger.info(
+            "Onboarding system prompt fingerprint: %s",
+            PROMPT_FINGERPRINTS["BUSINESS_ONBOARDING_SYSTEM_PROMPT"],
+        )
+
+    def _purge_sessions(self, now: float):
+        """Drop idle sessions and trim the store to MAX_SESSIONS."""
+        # LRU order means idle sessions are always at the front
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if now - oldest._last_used <= SESSION_TTL and len(self.sessions) <= MAX_SESSIONS:
+                break
+            session_id, _ = self.sessions.popitem(last=False)
+            logger.info(f"Evicted onboarding session: {session_id}")
 
-    def start_session(self) -> Tuple[str, AIResponse]:
+    def _remember(self, session: OnboardingSession, now: float):
+        """Store a session locally, marking it as recently used."""
+        session._last_used = now
+        self.sessions[session.session_id] = session
+        self.sessions.move_to_end(session.session_id)
+        self._purge_sessions(now)
+
+    async def _load_session(self, session_id: str) -> Optional[OnboardingSession]:
+        """Return a live session from Redis (when configured) or the local store."""
+        now = time.monotonic()
+        self._purge_sessions(now)
+        
+        redis = get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(SESSION_KEY_PREFIX + session_id)
+            except Exception as e:
+                logger.warning(f"Onboarding session Redis read failed: {e}")
+                raw = None
+            if raw is not None:
+                try:
+                    session = OnboardingSession.model_validate_json(raw)
+                except ValueError as e:
+                    # Corrupt or stale entry: fall back as if Redis had missed
+                    logger.warning(f"Onboarding session Redis entry unreadable: {e}")
+                else:
+                    self._remember(session, now)
+                    return session
+        
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self._remember(session, now)
+        return session
+
+    async def _save_session(self, session: OnboardingSession):
+        """Write a session through to Redis so any worker can resume it."""
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.setex(
+                SESSION_KEY_PREFIX + session.session_id, SESSION_TTL, session.model_dump_json()
+            )
+        except Exception as e:
+            logger.warning(f"Onboarding session Redis write failed: {e}")
+
+    async def start_session(self) -> Tuple[str, AIResponse]:
         session_id = f"onb_{uuid.uuid4().hex[:12]}"
         
         session = OnboardingSession(session_id=session_id)
-        self.sessions[session_id] = session
+        self._remember(session, time.monotonic())
         
         # Initial greeting
         ai_response = AIResponse(text=ONBOARDING_FIRST_GREETING, should_speak=True)
-        session.messages.append(ConversationMessage(role="ai", content=ONBOARDING_FIRST_GREETING))
+        session.add_message(ConversationMessage(role="ai", content=ONBOARDING_FIRST_GREETING))
+        await self._save_session(session)
         
         logger.info(f"Started onboarding session: {session_id}")
         return session_id, ai_response
 
     async def process_turn(self, session_id: str, user_text: str) -> Tuple[AIResponse, BusinessProfile, bool]:
-        if session_id not in self.sessions:
+        session = await self._load_session(session_id)
+        if session is None:
             raise ValueError(f"Session {session_id} not found")
             
-        session = self.sessions[session_id]
         session.turn_count += 1
         
         # Add user message
-        session.messages.append(ConversationMessage(role="user", content=user_text))
+        session.add_message(ConversationMessage(role="user", content=user_text))
         
-        # Build context
+        # Build context - everything volatile goes in the user message so the
+        # static system prompt stays a cacheable prefix
         context = self._build_context(session)
-        user_prompt = f"Conversation context:\n{context}\n\nUser's latest message: {user_text}\n\nRespond with JSON."
+        user_prompt = render_onboarding_turn(context, user_text)
         
         try:
             result = await self.o3_client.generate_completion(
                 system_prompt=BUSINESS_ONBOARDING_SYSTEM_PROMPT,
                 user_prompt=user_prompt,
-                response_format={"type": "json_object"}
+                response_format=ONBOARDING_RESPONSE_FORMAT
             )
             
             if "error" in result:
                 raise Exception(result['error'])
                 
             ai_message_text = result.get("ai_message", "Could you tell me more?")
-            extracted_info = result.get("extracted_info", {})
+            extracted_info = result.get("profile") or result.get("extracted_info", {})
             is_complete = result.get("onboarding_completed", False)
             
             # Update profile
             self._update_profile(session.profile, extracted_info)
             session.is_complete = is_complete
+            session.profile.onboarding_completed = is_complete
             
             # Add AI message
-            session.messages.append(ConversationMessage(role="ai", content=ai_message_text))
+            session.add_message(ConversationMessage(role="ai", content=ai_message_text))
             
             return AIResponse(text=ai_message_text), session.profile, is_complete
             
         except Exception as e:
             logger.error(f"Error in onboarding turn: {e}", exc_info=True)
             return AIResponse(text="I'm having trouble understanding. Could you repeat that?"), session.profile, False
+        
+        finally:
+            await self._save_session(session)
 
-    def get_session(self, session_id: str) -> OnboardingSession:
-        if session_id not in self.sessions:
+    async def process_turns_batch(
+        self,
+        turns: List[Tuple[str, str]],
+        concurrency: int = 32
+    ) -> List[Tuple[AIResponse, BusinessProfile, bool]]:
+        """
+        Process many (session_id, user_text) turns, e.g. when replaying sessions.
+        
+        Turns for the same session run in order; different sessions run
+        concurrently, at most `concurrency` at a time. Results follow input order.
+        """
+        for session_id in {session_id for session_id, _ in turns}:
+            if await self._load_session(session_id) is None:
+                raise ValueError(f"Session {session_id} not found")
+        
+        by_session: Dict[str, List[int]] = {}
+        for i, (session_id, _) in enumerate(turns):
+            by_session.setdefault(session_id, []).append(i)
+        
+        results: List[Optional[Tuple[AIResponse, BusinessProfile, bool]]] = [None] * len(turns)
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def run_session(indices: List[int]):
+            async with sem:
+                for i in indices:
+                    results[i] = await self.process_turn(*turns[i])
+        
+        await asyncio.gather(*(run_session(indices) for indices in by_session.values()))
+        return results
+
+    async def get_session(self, session_id: str) -> OnboardingSession:
+        session = await self._load_session(session_id)
+        if session is None:
             raise ValueError(f"Session {session_id} not found")
-        return self.sessions[session_id]
+        return session
 
     def _build_context(self, session: OnboardingSession) -> str:
         parts = []
         if session.messages:
             parts.append("Conversation so far:")
-            for msg in session.messages[-8:]: # Keep last 8 messages
-                parts.append(f"{msg.role.upper()}: {msg.content}")
+            parts.extend(
+                f"{msg.role.upper()}: {msg.content}"
+                for msg in session.messages[-8:]  # Keep last 8 messages
+            )
         
-        # Add current profile state
-        profile_dump = session.profile.model_dump(exclude_none=True)
-        parts.append(f"\nCurrent Profile State: {profile_dump}")
+        # Add current profile state as compact JSON, serialized by pydantic in one pass
+        profile_json = session.profile.model_dump_json(exclude_none=True)
+        parts.append(f"\nCurrent Profile State: {profile_json}")
         
         return "\n".join(parts)
 
     def _update_profile(self, profile: BusinessProfile, new_info: dict):
         for key, value in new_info.items():
+            key = PROFILE_FIELD_ALIASES.get(key, key)
             if value and hasattr(profile, key):
                 # For lists, append unique items
                 if isinstance(value, list) and isinstance(getattr(profile, key), list):
                     current_list = getattr(profile, key) or []
-                    for item in value:
-                        if item not in current_list:
-                            current_list.append(item)
+                    try:
+                        seen = set(current_list)
+                        for item in value:
+                            if item not in seen:
+                                current_list.append(item)
+                                seen.add(item)
+                    except TypeError:
+                        # Unhashable items (e.g. dicts): fall back to list membership
+                        for item in value:
+                            if item not in current_list:
+                                current_list.append(item)
                     setattr(profile, key, current_list)
                 else:
                     setattr(profile, key, value)
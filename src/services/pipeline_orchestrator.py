@@ -1,12 +1,32 @@
 """Pipeline orchestrator - coordinates multi-stage AI processing."""
 
+import time
 import hashlib
 import asyncio
+from collections import OrderedDict
 from typing import Optional, Dict, List
+import orjson
+from src.config import get_settings
+from src.services.redis_client import get_redis
 from src.services.azure_vision_client import AzureVisionClient
 from src.services.reasoning_service import get_reasoning_service
 from src.services.prompt_refinement_service import get_prompt_refinement_service
 
+# Redis key namespace; bump the version when the vision_data shape or the
+# key derivation changes
+VISION_CACHE_PREFIX = "kratorai:vision:v2:"
+
+
+def _digest(data: bytes) -> str:
+    """
+    Cache key for user-supplied bytes.
+    
+    Keys are shared across users and workers through Redis, so the hash must
+    be collision resistant: a crafted collision would hand one user's upload
+    another user's analysis.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
 
 class PipelineOrchestrator:
     """Orchestrates the multi-stage AI pipeline."""
@@ -16,8 +36,13 @@ class PipelineOrchestrator:
         self.reasoning_service = get_reasoning_service()
         self.prompt_refinement_service = get_prompt_refinement_service()
         
-        # Simple in-memory cache (can be replaced with Redis in production)
-        self.vision_cache: Dict[str, dict] = {}
+        # Caps reference-image fan-out so large batches stay under Vision rate limits
+        self._ref_semaphore = asyncio.Semaphore(get_settings().vision_concurrency)
+        
+        # In-memory LRU cache, in front of Redis when REDIS_URL is set
+        # Entries are (stored_at, vision_data), stored_at from time.monotonic()
+        self.vision_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.cache_max_entries = 100
         self.cache_ttl = 3600  # 1 hour
     
     async def process_design_upload(
@@ -98,23 +123,25 @@ class PipelineOrchestrator:
         Returns:
             Dictionary with vision_data and refinement details
         """
+        async def _process_ref(i: int, ref_data: bytes) -> dict:
+            async with self._ref_semaphore:
+                ref_vision = await self.vision_client.extract_visual_data(image_data=ref_data)
+                # Get a simple description for each reference asset
+                ref_desc = await self.reasoning_service.generate_design_description(ref_vision)
+            return {
+                "id": f"asset_{i+1}",
+                "category": ref_desc.get("category", "asset"),
+                "description": ref_desc.get("description", "A reference visual asset"),
+                "vision_data": ref_vision
+            }
+        
         try:
-            # Stage 1: Main Image Vision Perception
-            vision_data = await self._get_vision_data(image_data, image_url)
-            
-            # Stage 2: Reference Images Vision Perception
-            reference_assets = []
-            if reference_images_data:
-                for i, ref_data in enumerate(reference_images_data):
-                    ref_vision = await self.vision_client.extract_visual_data(image_data=ref_data)
-                    # Get a simple description for each reference asset
-                    ref_desc = await self.reasoning_service.generate_design_description(ref_vision)
-                    reference_assets.append({
-                        "id": f"asset_{i+1}",
-                        "category": ref_desc.get("category", "asset"),
-                        "description": ref_desc.get("description", "A reference visual asset"),
-                        "vision_data": ref_vision
-                    })
+            # Stages 1 & 2: Main and reference image vision perception are
+            # independent, so run them all at once
+            vision_data, *reference_assets = await asyncio.gather(
+                self._get_vision_data(image_data, image_url),
+                *(_process_ref(i, ref_data) for i, ref_data in enumerate(reference_images_data or []))
+            )
             
             # Stage 3: Prompt Refinement
             refinement_data = await self.prompt_refinement_service.refine_user_prompt(
@@ -152,12 +179,36 @@ class PipelineOrchestrator:
     ) -> dict:
         """Get vision data with caching."""
         # Generate cache key
-        cache_key = self._generate_cache_key(image_data, image_url)
+        cache_key = await self._generate_cache_key(image_data, image_url)
+        
+        # Check cache, treating expired entries as misses
+        now = time.monotonic()
+        entry = self.vision_cache.get(cache_key)
+        if entry is not None:
+            stored_at, cached = entry
+            if now - stored_at <= self.cache_ttl:
+                print(f"Vision cache HIT for key: {cache_key[:16]}...")
+                self.vision_cache.move_to_end(cache_key)
+                return cached
+            del self.vision_cache[cache_key]
         
-        # Check cache
-        if cache_key in self.vision_cache:
-            print(f"Vision cache HIT for key: {cache_key[:16]}...")
-            return self.vision_cache[cache_key]
+        # Shared cache, so other workers' results are reused
+        redis = get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(VISION_CACHE_PREFIX + cache_key)
+            except Exception as e:
+                print(f"Vision cache Redis read failed: {e}")
+                raw = None
+            if raw is not None:
+                try:
+                    vision_data = orjson.loads(raw)
+                except orjson.JSONDecodeError as e:
+                    print(f"Vision cache Redis entry unreadable: {e}")
+                else:
+                    print(f"Vision cache Redis HIT for key: {cache_key[:16]}...")
+                    self._store_local(cache_key, now, vision_data)
+                    return vision_data
         
         # Cache miss - extract vision data
         print(f"Vision cache MISS for key: {cache_key[:16]}...")
@@ -166,30 +217,38 @@ class PipelineOrchestrator:
             image_url=image_url
         )
         
-        # Store in cache
-        self.vision_cache[cache_key] = vision_data
+        self._store_local(cache_key, now, vision_data)
         
-        # Simple cache cleanup (remove if cache gets too large)
-        if len(self.vision_cache) > 100:
-            # Remove oldest entries (first 20)
-            keys_to_remove = list(self.vision_cache.keys())[:20]
-            for key in keys_to_remove:
-                del self.vision_cache[key]
+        # Only share successful analyses; a failure shouldn't outlive this worker
+        if redis is not None and "error" not in vision_data:
+            try:
+                await redis.setex(
+                    VISION_CACHE_PREFIX + cache_key, self.cache_ttl, orjson.dumps(vision_data)
+                )
+            except Exception as e:
+                print(f"Vision cache Redis write failed: {e}")
         
         return vision_data
     
-    def _generate_cache_key(
+    def _store_local(self, cache_key: str, stored_at: float, vision_data: dict):
+        """Store in the in-memory cache, evicting the least recently used entries."""
+        self.vision_cache[cache_key] = (stored_at, vision_data)
+        self.vision_cache.move_to_end(cache_key)
+        while len(self.vision_cache) > self.cache_max_entries:
+            self.vision_cache.popitem(last=False)
+    
+    async def _generate_cache_key(
         self,
         image_data: Optional[bytes],
         image_url: Optional[str]
     ) -> str:
         """Generate a cache key for an image."""
         if image_data:
-            # Hash the image bytes
-            return hashlib.md5(image_data).hexdigest()
+            # Hash the image bytes off the event loop; uploads can be several MB
+            return await asyncio.to_thread(_digest, image_data)
         elif image_url:
             # Hash the URL
-            return hashlib.md5(image_url.encode()).hexdigest()
+            return _digest(image_url.encode())
         return "no_image"
 
 
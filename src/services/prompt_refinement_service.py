@@ -3,6 +3,25 @@
 from typing import Dict, List, Optional
 from src.services.o3_mini_client import get_o3_mini_client
 
+# Static instructions; built once rather than on every refinement call
+_REFINEMENT_SYSTEM_PROMPT = """You are a design prompt refinement expert. Your job is to transform vague or incomplete user prompts into clear, explicit instructions for an image generation AI.
+
+Rules:
+1. PRESERVE user intent - don't invent requirements they didn't ask for
+2. Make prompts EXPLICIT and SPECIFIC (colors, placement, style)
+3. Ensure SAFETY - preserve important elements from the original design
+4. ALIGN with detected layout and structure
+5. Be DESIGN-AWARE (contrast, readability, composition)
+6. INCORPORATE reference assets (logos, images) if provided and requested by the user.
+
+Respond ONLY with valid JSON containing:
+- refined_prompt: Enhanced version of the prompt (detailed and explicit)
+- refinement_rationale: Brief explanation of changes made
+- detected_intent: Primary goal (aesthetic_improvement, content_change, color_adjustment, layout_redesign, text_modification, or other)
+- preserved_elements: Array of design elements that should be kept (e.g., headline, logo, CTA, date)
+
+Be concise and professional."""
+
 
 class PromptRefinementService:
     """Service for refining user prompts before FLUX generation."""
@@ -42,25 +61,6 @@ class PromptRefinementService:
                 "preserved_elements": []
             }
         
-        # Build system prompt
-        system_prompt = """You are a design prompt refinement expert. Your job is to transform vague or incomplete user prompts into clear, explicit instructions for an image generation AI.
-
-Rules:
-1. PRESERVE user intent - don't invent requirements they didn't ask for
-2. Make prompts EXPLICIT and SPECIFIC (colors, placement, style)
-3. Ensure SAFETY - preserve important elements from the original design
-4. ALIGN with detected layout and structure
-5. Be DESIGN-AWARE (contrast, readability, composition)
-6. INCORPORATE reference assets (logos, images) if provided and requested by the user.
-
-Respond ONLY with valid JSON containing:
-- refined_prompt: Enhanced version of the prompt (detailed and explicit)
-- refinement_rationale: Brief explanation of changes made
-- detected_intent: Primary goal (aesthetic_improvement, content_change, color_adjustment, layout_redesign, text_modification, or other)
-- preserved_elements: Array of design elements that should be kept (e.g., headline, logo, CTA, date)
-
-Be concise and professional."""
-
         # Build reference assets context
         assets_context = ""
         if reference_assets:
@@ -68,25 +68,29 @@ Be concise and professional."""
             for asset in reference_assets:
                 assets_context += f"- {asset['id']}: {asset['category']} - {asset['description']}\n"
 
+        text_summary = self._summarize_text(vision_data.get('text_blocks', []))
+        visual_tags = ', '.join(vision_data.get('basic_tags', []))
+
         # Build user prompt with context
         user_prompt_formatted = f"""User's original prompt: "{user_prompt}"
 
 **Design Context (from visual analysis of main template):**
 - Layout: {vision_data.get('layout', 'unknown')}
 - Text Density: {vision_data.get('text_density', 'unknown')}
-- Detected Text: {self._summarize_text(vision_data.get('text_blocks', []))}
-- Visual Tags: {', '.join(vision_data.get('basic_tags', []))}
+- Detected Text: {text_summary}
+- Visual Tags: {visual_tags}
 - Has Images: {vision_data.get('has_images', False)}
 {assets_context}
 
 Refine the user's prompt to be clear and explicit while preserving their intent. If reference assets are provided, describe exactly how and where they should be incorporated into the design based on the user's instructions. Output JSON only."""
 
-        # Call o3-mini with deterministic temperature
+        # Call o3-mini; an identical prompt and design context reuses the
+        # cached refinement rather than sampling a new one
         result = await self.o3_client.generate_completion(
-            system_prompt=system_prompt,
+            system_prompt=_REFINEMENT_SYSTEM_PROMPT,
             user_prompt=user_prompt_formatted,
             response_format={"type": "json_object"},
-            temperature=0.0  # Fully deterministic for consistent refinement
+            cache=True
         )
         
         # Handle errors
@@ -5,16 +5,30 @@ Handles WebSocket connections, audio streaming, and real-time events.
 
 import asyncio
 import base64
-import json
 import logging
+import orjson
+from dataclasses import dataclass, field
 from typing import Optional, AsyncIterator, Dict, Any
 import websockets
 from websockets.client import WebSocketClientProtocol
+from websockets.protocol import State
 
 from src.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Constant control frames, serialized once. Frames go out as str so
+# websockets sends them as text, which the Realtime API expects.
+_COMMIT_FRAME = orjson.dumps({"type": "input_audio_buffer.commit"}).decode()
+_RESPONSE_CREATE_FRAME = orjson.dumps({"type": "response.create"}).decode()
+
+
+@dataclass
+class RealtimeSession:
+    """A live realtime connection and the lock serializing writes to it."""
+    ws: WebSocketClientProtocol
+    send_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
 
 class RealtimeClient:
     """Client for Azure OpenAI Realtime API (gpt-realtime-mini)."""
@@ -31,12 +45,24 @@ class RealtimeClient:
             self.api_key = settings.azure_realtime_key
             self.deployment = settings.azure_realtime_deployment
             self.api_version = settings.azure_realtime_api_version
+            self.prewarm_connections = settings.realtime_prewarm_connections
             self.enabled = True
             
+            # Connection URL and headers are fixed per client, so build them once
+            self._ws_url = self._build_websocket_url()
+            self._headers = {"api-key": self.api_key}
+            logger.debug("Constructed WebSocket URL: %s", self._ws_url)
+            
         # Active sessions
-        self.sessions: Dict[str, WebSocketClientProtocol] = {}
+        self.sessions: Dict[str, RealtimeSession] = {}
+        
+        # Pre-connected sockets not yet bound to a session, so session start
+        # skips the TLS/WebSocket handshake. Sessions hold server-side
+        # conversation state, so sockets are never returned here after use.
+        self._idle: list = []
+        self._refill_task: Optional[asyncio.Task] = None
     
-    def _get_websocket_url(self) -> str:
+    def _build_websocket_url(self) -> str:
         """Construct WebSocket URL for Azure Realtime API."""
         # Clean the endpoint
         base_url = self.endpoint
@@ -61,9 +87,45 @@ class RealtimeClient:
             base_url = base_url.replace("http://", "ws://")
         
         # Construct final URL
-        ws_url = f"{base_url}/openai/realtime?api-version={self.api_version}&deployment={self.deployment}"
-        logger.info(f"Constructed WebSocket URL: {ws_url}")
-        return ws_url
+        return f"{base_url}/openai/realtime?api-version={self.api_version}&deployment={self.deployment}"
+    
+    def _get_websocket_url(self) -> str:
+        """Return the prebuilt WebSocket URL for Azure Realtime API."""
+        return self._ws_url
+    
+    async def _connect(self):
+        """Open a new WebSocket connection to the Realtime API."""
+        url = self._get_websocket_url()
+        logger.info(f"Connecting to Azure Realtime API: {url}")
+        return await websockets.connect(
+            url,
+            additional_headers=self._headers,
+            ping_interval=20,
+            ping_timeout=10
+        )
+    
+    async def _acquire_connection(self):
+        """Take a warm idle socket if one is still open, else connect now."""
+        ws = None
+        while self._idle:
+            candidate = self._idle.pop()
+            if candidate.state is State.OPEN:
+                ws = candidate
+                break
+        
+        if self.prewarm_connections and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.create_task(self._refill_idle())
+        
+        return ws if ws is not None else await self._connect()
+    
+    async def _refill_idle(self):
+        """Top the idle pool back up to prewarm_connections."""
+        while len(self._idle) < self.prewarm_connections:
+            try:
+                self._idle.append(await self._connect())
+            except Exception as e:
+                logger.warning(f"Failed to pre-warm realtime connection: {e}")
+                return
     
     async def create_session(
         self,
@@ -91,20 +153,8 @@ class RealtimeClient:
             return False
         
         try:
-            # Create WebSocket connection
-            url = self._get_websocket_url()
-            logger.info(f"Connecting to Azure Realtime API: {url}")
-            
-            headers = {
-                "api-key": self.api_key
-            }
-            
-            ws = await websockets.connect(
-                url,
-                additional_headers=headers,
-                ping_interval=20,
-                ping_timeout=10
-            )
+            # Get a WebSocket connection, pre-warmed when available
+            ws = await self._acquire_connection()
             
             # Configure session
             session_config = {
@@ -133,10 +183,10 @@ class RealtimeClient:
                 session_config["session"]["tools"] = tools
                 session_config["session"]["tool_choice"] = "auto"
             
-            await ws.send(json.dumps(session_config))
+            await ws.send(orjson.dumps(session_config).decode())
             
             # Store session
-            self.sessions[session_id] = ws
+            self.sessions[session_id] = RealtimeSession(ws)
             
             logger.info(f"Created realtime session: {session_id}")
             return True
@@ -145,6 +195,20 @@ class RealtimeClient:
             logger.error(f"Failed to create realtime session: {e}")
             return False
     
+    async def _send(self, session_id: str, frame: str) -> bool:
+        """
+        Send one serialized frame, one writer at a time per session.
+        
+        The route's client and server pumps both write to the same socket
+        (audio vs. tool outputs), so sends are serialized per session.
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return False
+        async with session.send_lock:
+            await session.ws.send(frame)
+        return True
+    
     async def send_audio_chunk(self, session_id: str, audio_base64: str):
         """
         Send audio chunk to the realtime session.
@@ -153,20 +217,15 @@ class RealtimeClient:
             session_id: Session identifier
             audio_base64: Base64-encoded audio data
         """
-        if session_id not in self.sessions:
-            logger.error(f"Session {session_id} not found")
-            return
-        
-        ws = self.sessions[session_id]
-        
         try:
             message = {
                 "type": "input_audio_buffer.append",
                 "audio": audio_base64
             }
-            await ws.send(json.dumps(message))
+            if not await self._send(session_id, orjson.dumps(message).decode()):
+                logger.error("Session %s not found", session_id)
         except Exception as e:
-            logger.error(f"Failed to send audio: {e}")
+            logger.error("Failed to send audio: %s", e)
     
     async def commit_audio(self, session_id: str):
         """
@@ -175,16 +234,10 @@ class RealtimeClient:
         Args:
             session_id: Session identifier
         """
-        if session_id not in self.sessions:
-            return
-        
-        ws = self.sessions[session_id]
-        
         try:
-            message = {"type": "input_audio_buffer.commit"}
-            await ws.send(json.dumps(message))
+            await self._send(session_id, _COMMIT_FRAME)
         except Exception as e:
-            logger.error(f"Failed to commit audio: {e}")
+            logger.error("Failed to commit audio: %s", e)
     
     async def create_response(self, session_id: str):
         """
@@ -193,16 +246,23 @@ class RealtimeClient:
         Args:
             session_id: Session identifier
         """
-        if session_id not in self.sessions:
-            return
-        
-        ws = self.sessions[session_id]
+        try:
+            await self._send(session_id, _RESPONSE_CREATE_FRAME)
+        except Exception as e:
+            logger.error("Failed to create response: %s", e)
+    
+    async def send_event(self, session_id: str, event: Dict[str, Any]):
+        """
+        Send an arbitrary client event (e.g. a function call output).
         
+        Args:
+            session_id: Session identifier
+            event: Event dictionary to serialize and send
+        """
         try:
-            message = {"type": "response.create"}
-            await ws.send(json.dumps(message))
+            await self._send(session_id, orjson.dumps(event).decode())
         except Exception as e:
-            logger.error(f"Failed to create response: {e}")
+            logger.error("Failed to send event: %s", e)
     
     async def listen(self, session_id: str) -> AsyncIterator[Dict[str, Any]]:
         """
@@ -214,19 +274,18 @@ class RealtimeClient:
         Yields:
             Event dictionaries from the realtime API
         """
-        if session_id not in self.sessions:
-            logger.error(f"Session {session_id} not found")
+        session = self.sessions.get(session_id)
+        if session is None:
+            logger.error("Session %s not found", session_id)
             return
         
-        ws = self.sessions[session_id]
-        
         try:
-            async for message in ws:
+            async for message in session.ws:
                 try:
-                    event = json.loads(message)
+                    event = orjson.loads(message)
                     yield event
-                except json.JSONDecodeError:
-                    logger.error(f"Invalid JSON from realtime API: {message}")
+                except orjson.JSONDecodeError:
+                    logger.error("Invalid JSON from realtime API: %s", message)
                     continue
         except websockets.exceptions.ConnectionClosed:
             logger.info(f"Realtime session {session_id} closed")
@@ -240,23 +299,29 @@ class RealtimeClient:
         Args:
             session_id: Session identifier
         """
-        if session_id not in self.sessions:
+        # Unregister before awaiting, so concurrent sends see it gone
+        session = self.sessions.pop(session_id, None)
+        if session is None:
             return
         
-        ws = self.sessions[session_id]
-        
         try:
-            await ws.close()
-            del self.sessions[session_id]
+            await session.ws.close()
             logger.info(f"Closed realtime session: {session_id}")
         except Exception as e:
             logger.error(f"Error closing session: {e}")
     
     async def cleanup(self):
-        """Close all active sessions."""
+        """Close all active sessions and idle pre-warmed connections."""
         session_ids = list(self.sessions.keys())
         for session_id in session_ids:
             await self.close_session(session_id)
+        
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            self._refill_task = None
+        idle, self._idle = self._idle, []
+        for ws in idle:
+            await ws.close()
 
 
 # Singleton
@@ -268,3 +333,9 @@ def get_realtime_client() -> RealtimeClient:
     if _realtime_client is None:
         _realtime_client = RealtimeClient()
     return _realtime_client
+
+
+async def close_realtime_client():
+    """Close the singleton's connections; called from the application shutdown."""
+    if _realtime_client is not None:
+        await _realtime_client.cleanup()
@@ -2,34 +2,11 @@
 
 from typing import Dict
 from src.services.o3_mini_client import get_o3_mini_client
-from src.prompts.reasoning_prompts import DESIGN_ANALYSIS_PROMPT
-
-
-# Predefined category mapping with IDs
-CATEGORY_MAPPING = {
-    "Professional Headshots": "691cce06000958fbe4ab",
-    "Casual Portraits": "691cce1c0039d32fdc33",
-    "Avatars & Characters": "691cce9dd928966d96eb",
-    "Marketing Banners": "691cce9dd92dedfb123e",
-    "Posters & Flyers": "691cce9dd92ef6f4ab51",
-    "Social Media Graphics": "691cce9dd92fc8863542",
-    "Logos & Icons": "691cce9dd9307e861459",
-    "Product Mockups": "691cce9dd931393bece9",
-    "E-commerce Visuals": "691cce9dd932150db6b9",
-    "Food Photography": "691cce9dd932cc54cc6c",
-    "Fashion & Accessories": "691cce9dd9337ac0cb4d",
-    "Landscapes & Cityscapes": "691cce9dd9343303585f",
-    "Interior Design": "691cce9dd934e7f1e1c6",
-    "Event Backdrops": "691cce9dd93690dd2df1",
-    "Concept Art": "691cce9dd9374b9d915b",
-    "Digital Art & Illustration": "691cce9dd937f47353b0",
-    "Cartoons & Comics": "691cce9dd93896d2200b",
-    "Fantasy Creatures": "691cce9dd9399fde6ac0",
-    "Infographics": "691cce9dd93a45bccfd6",
-    "Presentation Backgrounds": "691cce9dd93b0b79fcae",
-    "Educational Diagrams": "691cce9dd93bbf6d2002",
-    "UI/UX Mockups": "691cce9dd93c5551ea7c"
-}
+from src.prompts.reasoning_prompts import DESIGN_ANALYSIS_PROMPT, CATEGORY_ID
+
+
+# Predefined category mapping with IDs (shared with the prompt's category table)
+CATEGORY_MAPPING = CATEGORY_ID
 
 
 class ReasoningService:
@@ -91,11 +68,12 @@ class ReasoningService:
 
 Generate a comprehensive design analysis in JSON format."""
 
-        # Call o3-mini
+        # Call o3-mini; the same vision data reuses the cached analysis
         result = await self.o3_client.generate_completion(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            cache=True
         )
         
         # Handle errors
@@ -116,13 +94,18 @@ Generate a comprehensive design analysis in JSON format."""
         
         # Ensure all required fields exist with defaults
         result.setdefault("description", "No description available")
+        # The prompt asks for "category_name"; fold it into "category"
+        category_name = result.pop("category_name", None)
+        if category_name:
+            result["category"] = category_name
         result.setdefault("category", "Posters & Flyers")  # Default to most common category
         result.setdefault("style", [])
         result.setdefault("editable_elements", [])
         result.setdefault("design_quality", "medium")
         result.setdefault("target_audience", "general public")
         
-        # Map category name to category ID
+        # Map category name to category ID - the table is authoritative, so any
+        # category_id the model returned is overwritten below
         category_name = result.get("category", "Posters & Flyers")
         category_id = CATEGORY_MAPPING.get(category_name)
         
@@ -0,0 +1,45 @@
+"""Optional shared Redis connection for cross-worker caches.
+
+Enabled by setting REDIS_URL. Without it, or without the redis package,
+get_redis() returns None and callers keep to their in-process caches.
+The FastAPI lifespan closes the connection pool.
+"""
+
+import logging
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_redis = None
+_disabled = False
+
+
+def get_redis():
+    """Return the shared redis.asyncio client, or None when not configured."""
+    global _redis, _disabled
+    if _redis is not None or _disabled:
+        return _redis
+    
+    url = get_settings().redis_url
+    if not url:
+        _disabled = True
+        return None
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logger.warning("REDIS_URL is set but redis is not installed; using in-process caches only")
+        _disabled = True
+        return None
+    
+    _redis = redis.from_url(url)
+    logger.info("Connected shared cache to Redis")
+    return _redis
+
+
+async def close_redis():
+    """Close the shared client; called from the application shutdown."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -1,5 +1,6 @@
 """Design refining service."""
 
+import asyncio
 import base64
 import logging
 import tempfile
@@ -37,12 +38,9 @@ class RefiningService:
         Returns:
             List of generated variations with URIs
         """
-        variations = []
-        
-        # FLUX.1 might not support batch generation in one call depending on the API,
-        # so we'll loop.
-        
-        for i in range(num_variations):
+        # FLUX.1 generates one image per call, so variations are requested
+        # concurrently and total latency is roughly that of a single call.
+        async def _one(i: int) -> dict:
             # Vary the prompt slightly for diversity
             varied_prompt = f"{prompt} (Variation {i + 1})"
             
@@ -112,17 +110,29 @@ class RefiningService:
                     f"Response keys: {list(result.keys())}"
                 )
 
-            variations.append({
+            variation = {
                 "asset_id": asset_id,
                 "asset_uri": asset_uri,
                 "thumbnail_uri": thumbnail_uri,
                 "variation_index": i,
                 "generation_result": result,
-            })
+            }
             
             logger.info(f"Successfully generated variation {i + 1} with asset_uri: {asset_uri[:100]}...")
+            
+            return variation
+        
+        results = await asyncio.gather(
+            *(_one(i) for i in range(num_variations)),
+            return_exceptions=True
+        )
+        
+        # Fail the same way the sequential loop did: first failed variation wins
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
         
-        return variations
+        return results
     
     def _save_base64_image(self, b64_data: str, asset_id: str) -> str:
         """
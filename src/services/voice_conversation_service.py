@@ -10,7 +10,7 @@ import uuid
 from typing import Dict, Optional, Tuple, Any
 from datetime import datetime
 
-from src.services.o3_mini_client import O3MiniClient
+from src.services.o3_mini_client import get_o3_mini_client
 from src.api.schemas.voice import (
     VoiceConversationHistory,
     ConversationMessage,
@@ -19,12 +19,13 @@ from src.api.schemas.voice import (
     AIResponse,
     ConversationState
 )
+from src.prompts.constants import MAX_CONVERSATION_TURNS
 from src.prompts.voice_prompts import (
+    VOICE_CONVERSATION_TURN_SYSTEM_PROMPT,
     CONFIRMATION_TEMPLATE,
-    COMPLETENESS_REQUIREMENTS,
-    MAX_CONVERSATION_TURNS,
     DEFAULT_PROMPT_TEMPLATES,
-    EDITING_TECHNICAL_GUIDELINES  # New import
+    PROMPT_FINGERPRINTS,
+    first_question,
 )
 from src.utils.logging import get_logger
 
@@ -35,9 +36,13 @@ class VoiceConversationService:
     """Service for managing voice conversations."""
     
     def __init__(self):
-        self.o3_client = O3MiniClient()
+        self.o3_client = get_o3_mini_client()
         # In-memory session storage (use Redis in production)
         self.sessions: Dict[str, VoiceConversationHistory] = {}
+        logger.info(
+            "Voice conversation system prompt fingerprint: %s",
+            PROMPT_FINGERPRINTS["VOICE_CONVERSATION_TURN_SYSTEM_PROMPT"],
+        )
     
     def start_conversation(
         self, 
@@ -210,8 +215,8 @@ class VoiceConversationService:
         elif "social" in initial_message.lower():
             conversation.extracted_info.design_type = "social_media"
         
-        # Generate appropriate first question
-        return "Great! I can help you with that. What style are you going for? Modern, traditional African patterns, or something else?"
+        # Generate appropriate first question (rotates through the intent's phrasings)
+        return first_question(intent) or "Great! I can help you with that. What style are you going for? Modern, traditional African patterns, or something else?"
     
     def _classify_intent(self, text: str) -> str:
         """Classify user's intent from their message."""
@@ -250,15 +255,13 @@ class VoiceConversationService:
 
 User's latest message: {user_text}
 
-REFERENCE GUIDELINES:
-{EDITING_TECHNICAL_GUIDELINES}
-
 Respond with JSON containing ai_message, extracted_info, and conversation_complete."""
         
         try:
-            # Call o3-mini for response using the correct method
+            # Call o3-mini for response; the static system prompt is the
+            # cacheable prefix, so nothing per-turn may be folded into it
             result = await self.o3_client.generate_completion(
-                system_prompt=VOICE_CONVERSATION_SYSTEM_PROMPT,
+                system_prompt=VOICE_CONVERSATION_TURN_SYSTEM_PROMPT,
                 user_prompt=user_prompt,
                 response_format={"type": "json_object"}
             )
@@ -0,0 +1,34 @@
+"""
+Request body size limit for KratorAI API.
+"""
+
+from fastapi.responses import JSONResponse
+
+
+class MaxBodySizeMiddleware:
+    """
+    Reject requests whose declared Content-Length exceeds a limit.
+    
+    Plain ASGI middleware, so oversized uploads get a 413 before any body
+    bytes are read. Chunked requests without Content-Length pass through
+    and are still checked per file by validate_image_upload.
+    """
+    
+    def __init__(self, app, max_size: int):
+        self.app = app
+        self.max_size = max_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_size:
+                        response = JSONResponse(
+                            status_code=413,
+                            content={"detail": f"Request body exceeds maximum of {self.max_size} bytes"}
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        
+        await self.app(scope, receive, send)
@@ -3,6 +3,7 @@
 from PIL import Image
 import io
 import base64
+import struct
 from typing import Optional
 
 
@@ -49,3 +50,54 @@ def validate_image_format(image: Image.Image, allowed_formats: Optional[list[str
         allowed_formats = ["PNG", "JPEG", "WEBP"]
     
     return image.format in allowed_formats if image.format else True
+
+
+# JPEG start-of-frame markers carry the dimensions; C4/C8/CC are not frames
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size_from_header(data: bytes) -> Optional[tuple[int, int]]:
+    """Read (width, height) from PNG, GIF, WebP or JPEG headers without PIL.
+    
+    Returns None for anything it cannot parse so callers can fall back to PIL.
+    """
+    try:
+        if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+            return struct.unpack(">II", data[16:24])
+        
+        if data[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", data[6:10])
+        
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            chunk = data[12:16]
+            if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+                width, height = struct.unpack("<HH", data[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b"VP8L" and data[20] == 0x2F:
+                bits = int.from_bytes(data[21:25], "little")
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                return (
+                    int.from_bytes(data[24:27], "little") + 1,
+                    int.from_bytes(data[27:30], "little") + 1,
+                )
+            return None
+        
+        if data[:2] == b"\xff\xd8":
+            i = 2
+            while i + 9 <= len(data):
+                if data[i] != 0xFF:
+                    return None
+                marker = data[i + 1]
+                if marker == 0xFF:  # fill byte
+                    i += 1
+                elif marker in _JPEG_SOF_MARKERS:
+                    height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                    return width, height
+                elif marker == 0x01 or 0xD0 <= marker <= 0xD8:  # no length field
+                    i += 2
+                else:
+                    i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    except (struct.error, IndexError):
+        pass
+    return None
@@ -2,12 +2,20 @@
 Structured logging configuration for KratorAI.
 """
 
+import os
 import logging
+import logging.handlers
+import copy
+import queue
 import sys
 import json
-from typing import Any
+from typing import Any, Optional
 from datetime import datetime
 
+# Writes stdout from a background thread so handlers never block the event loop
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
 class JSONFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
     
@@ -33,6 +41,16 @@ class JSONFormatter(logging.Formatter):
             
         return json.dumps(log_obj)
 
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps exc_info so JSONFormatter still sees it."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Merge args now; they may be mutated before the listener formats
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
 def setup_logging(
     level: str = "INFO",
     json_format: bool = True,
@@ -44,6 +62,8 @@ def setup_logging(
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         json_format: Whether to use JSON formatting (recommended for production)
     """
+    stop_logging()
+    
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
     
@@ -62,14 +82,59 @@ def setup_logging(
                 "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
             )
         )
-        
-    root_logger.addHandler(handler)
+    
+    _start_listener(handler)
     
     # Set levels for third-party libraries
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
 
+def _start_listener(*handlers: logging.Handler) -> None:
+    """Route root records through a queue to handlers on a listener thread."""
+    global _listener, _queue_handler
+    _listener = logging.handlers.QueueListener(queue.SimpleQueue(), *handlers)
+    _listener.start()
+    _queue_handler = _QueueHandler(_listener.queue)
+    logging.getLogger().addHandler(_queue_handler)
+
+def stop_logging() -> None:
+    """
+    Flush queued log records and stop the listener thread.
+    
+    The real handlers go back on the root logger, so records logged after
+    shutdown are still written, just on the calling thread.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    root_logger = logging.getLogger()
+    root_logger.removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        root_logger.addHandler(handler)
+    _listener = None
+    _queue_handler = None
+
+def _restart_listener_after_fork() -> None:
+    """
+    Give a forked worker its own listener thread.
+    
+    Threads are not copied by fork(), so without this a worker forked from a
+    preloaded parent would queue records that nothing ever writes.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    handlers = _listener.handlers
+    # Records still queued belong to the parent, which writes them itself
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
+    _start_listener(*handlers)
+
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name."""
     return logging.getLogger(name)
@@ -0,0 +1,156 @@
+"""
+Retry and circuit breaking for upstream HTTP calls.
+"""
+
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Upstream statuses worth another attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Transport failures where the request most likely never reached the model.
+# Read timeouts are not retried: the upstream may still be generating.
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast after repeated upstream failures.
+
+    Opens after fail_max consecutive failed calls and rejects calls until
+    reset_timeout seconds have passed. The next call is then let through
+    as a single probe while every other call is still rejected; its success
+    closes the circuit and its failure reopens it. A probe that never
+    reports back is replaced by a new one after another reset_timeout.
+    """
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+
+    def before_call(self):
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        if self.probe_started_at is not None:
+            if now - self.probe_started_at < self.reset_timeout:
+                raise CircuitOpenError(f"Upstream {self.name} is unavailable; probe in flight")
+        else:
+            remaining = self.reset_timeout - (now - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"Upstream {self.name} is unavailable; retry in {remaining:.0f}s"
+                )
+        # Half-open: this call is the probe, the circuit stays open for others
+        self.probe_started_at = now
+
+    def record_success(self):
+        self.failures = 0
+        if self.opened_at is not None:
+            logger.info(f"Circuit closed for {self.name}")
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self):
+        if self.probe_started_at is not None:
+            # Failed probe: reopen for another full timeout
+            self.probe_started_at = None
+            self.opened_at = time.monotonic()
+            logger.warning(f"Circuit reopened for {self.name} after a failed probe")
+            return
+        self.failures += 1
+        if self.failures >= self.fail_max and self.opened_at is None:
+            self.opened_at = time.monotonic()
+            logger.warning(f"Circuit opened for {self.name} after {self.failures} failures")
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for an upstream, creating it on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def _backoff(attempt: int, initial: float, max_wait: float) -> float:
+    """Exponential backoff with jitter for the given 1-based attempt."""
+    return min(max_wait, initial * 2 ** (attempt - 1) + random.uniform(0, initial))
+
+
+def _retry_after(response: httpx.Response, max_wait: float) -> Optional[float]:
+    """Seconds requested by a Retry-After header, if given in seconds."""
+    value = response.headers.get("retry-after", "")
+    try:
+        return min(max_wait, max(0.0, float(value)))
+    except ValueError:
+        return None
+
+
+async def post_with_retry(
+    client: httpx.AsyncClient,
+    url: str,
+    breaker: Optional[CircuitBreaker] = None,
+    attempts: int = 4,
+    initial: float = 0.5,
+    max_wait: float = 8.0,
+    **kwargs,
+) -> httpx.Response:
+    """
+    POST with retries on transient upstream failures.
+
+    Retries RETRY_STATUSES responses and RETRY_EXCEPTIONS with exponential
+    backoff and jitter, honoring Retry-After. The last response is returned
+    (or the last error raised) once attempts run out, and the call counts as
+    one failure for the breaker.
+    """
+    if breaker is not None:
+        breaker.before_call()
+
+    for attempt in range(1, attempts + 1):
+        try:
+            response = await client.post(url, **kwargs)
+        except RETRY_EXCEPTIONS as e:
+            if attempt == attempts:
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            delay = _backoff(attempt, initial, max_wait)
+            logger.warning(f"POST {url} failed ({e!r}); retry {attempt} in {delay:.1f}s")
+        except httpx.RequestError:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                if breaker is not None:
+                    breaker.record_success()
+                return response
+            if attempt == attempts:
+                if breaker is not None:
+                    breaker.record_failure()
+                return response
+            delay = _retry_after(response, max_wait)
+            if delay is None:
+                delay = _backoff(attempt, initial, max_wait)
+            logger.warning(
+                f"POST {url} returned {response.status_code}; retry {attempt} in {delay:.1f}s"
+            )
+        await asyncio.sleep(delay)
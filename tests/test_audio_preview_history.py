@@ -0,0 +1,101 @@
+"""Tests for AudioPreviewClient conversation history."""
+
+import asyncio
+
+import httpx
+
+from src.services import audio_preview_client
+from src.services.audio_preview_client import AudioPreviewClient, USER_AUDIO_PLACEHOLDER
+
+TRANSCRIPTION_URL = "https://audio.example/audio/transcriptions"
+
+
+class FakeHttp:
+    """Answers turn requests with a spoken reply and transcription requests with text."""
+
+    def __init__(self, transcripts=()):
+        self.transcripts = list(transcripts)
+        self.turn_payloads = []
+        self.transcribed = []
+
+    async def post(self, url, headers=None, json=None, files=None, data=None):
+        request = httpx.Request("POST", url)
+        if url == TRANSCRIPTION_URL:
+            self.transcribed.append(files["file"][1])
+            text = self.transcripts.pop(0)
+            if text is None:
+                return httpx.Response(500, request=request)
+            return httpx.Response(200, json={"text": text}, request=request)
+        self.turn_payloads.append(json)
+        reply = f"Reply {len(self.turn_payloads)}"
+        return httpx.Response(
+            200,
+            json={"choices": [{"message": {"audio": {"transcript": reply, "data": ""}}}]},
+            request=request,
+        )
+
+
+def _client(monkeypatch, http, transcription=False):
+    monkeypatch.setattr(audio_preview_client, "get_http_client", lambda base_url: http)
+    client = AudioPreviewClient()
+    client.enabled = True
+    client.endpoint = "https://audio.example"
+    client._api_url = "https://audio.example/chat/completions"
+    client._transcription_url = TRANSCRIPTION_URL if transcription else ""
+    asyncio.run(client.create_session("s1", "system"))
+    return client
+
+
+def _audio_parts(payload):
+    return [
+        part
+        for message in payload["messages"]
+        if isinstance(message["content"], list)
+        for part in message["content"]
+        if part.get("type") == "input_audio"
+    ]
+
+
+def _user_history(client):
+    return [m["content"] for m in client.sessions["s1"]["messages"] if m["role"] == "user"]
+
+
+def test_transcription_is_opt_in(monkeypatch):
+    http = FakeHttp()
+    client = _client(monkeypatch, http)
+
+    asyncio.run(client.process_audio_turn("s1", b"clip-1"))
+    asyncio.run(client.process_audio_turn("s1", b"clip-2", transcript="Make it blue"))
+
+    assert http.transcribed == []
+    assert _user_history(client) == [USER_AUDIO_PLACEHOLDER, "Make it blue"]
+    # Only the current clip is uploaded
+    assert len(_audio_parts(http.turn_payloads[-1])) == 1
+
+
+def test_later_turns_see_transcribed_user_speech(monkeypatch):
+    http = FakeHttp(["Make the logo blue", "And the title bigger"])
+    client = _client(monkeypatch, http, transcription=True)
+
+    first = asyncio.run(client.process_audio_turn("s1", b"clip-1"))
+    asyncio.run(client.process_audio_turn("s1", "Y2xpcC0y"))  # base64 of clip-2
+    asyncio.run(client.process_audio_turn("s1", b"clip-3", transcript="Yes, proceed"))
+
+    assert first["transcript"] == "Make the logo blue"
+    assert http.transcribed == [b"clip-1", b"clip-2"]
+    last_payload = http.turn_payloads[-1]
+    assert {"role": "user", "content": "Make the logo blue"} in last_payload["messages"]
+    assert {"role": "user", "content": "And the title bigger"} in last_payload["messages"]
+    assert len(_audio_parts(last_payload)) == 1
+    assert _user_history(client)[-1] == "Yes, proceed"
+
+
+def test_failed_transcription_stores_the_placeholder(monkeypatch):
+    http = FakeHttp([None])
+    client = _client(monkeypatch, http, transcription=True)
+
+    asyncio.run(client.process_audio_turn("s1", b"clip-1"))
+    asyncio.run(client.process_audio_turn("s1", b"clip-2", transcript="Second"))
+
+    assert _user_history(client) == [USER_AUDIO_PLACEHOLDER, "Second"]
+    assert len(_audio_parts(http.turn_payloads[-1])) == 1
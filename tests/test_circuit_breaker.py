@@ -0,0 +1,75 @@
+"""Tests for the upstream circuit breaker."""
+
+import pytest
+
+from src.utils import retry
+from src.utils.retry import CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def _open_breaker():
+    breaker = CircuitBreaker("flux", fail_max=2, reset_timeout=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    return breaker
+
+
+def test_open_circuit_rejects_calls(clock):
+    breaker = _open_breaker()
+    clock.now += 10
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = _open_breaker()
+    clock.now += 31
+
+    breaker.before_call()
+    for _ in range(5):
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    breaker.record_success()
+    breaker.before_call()
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_for_a_full_timeout(clock):
+    breaker = _open_breaker()
+    clock.now += 31
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 2
+    breaker.before_call()
+
+
+def test_lost_probe_is_replaced_after_the_timeout(clock):
+    breaker = _open_breaker()
+    clock.now += 31
+    breaker.before_call()  # never reports back
+
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 2
+    breaker.before_call()
@@ -0,0 +1,62 @@
+"""Tests for FLUX input downscaling."""
+
+import io
+
+from PIL import Image
+
+from src.services.flux_client import _Base64Sink, _downscale, base64
+
+# EXIF Orientation tag; 6 means the camera was rotated 90 degrees clockwise
+ORIENTATION = 0x0112
+
+
+def _jpeg(width: int, height: int, orientation: int = 1) -> bytes:
+    img = Image.new("RGB", (width, height), "white")
+    # Mark the left edge so the rotation direction can be checked
+    img.paste((255, 0, 0), (0, 0, width // 10, height))
+    exif = Image.Exif()
+    exif[ORIENTATION] = orientation
+    out = io.BytesIO()
+    img.save(out, format="JPEG", exif=exif)
+    return out.getvalue()
+
+
+def test_downscale_applies_exif_orientation():
+    # Stored landscape, displayed portrait
+    data = _jpeg(2000, 1000, orientation=6)
+
+    with Image.open(io.BytesIO(_downscale(data, 1536))) as img:
+        assert img.size == (768, 1536)
+        # Rotating 90 degrees clockwise moves the stored left edge to the top
+        red, green, _ = img.getpixel((img.width // 2, 5))
+        assert red > 200 and green < 80
+
+
+def test_downscale_keeps_images_that_fit():
+    data = _jpeg(800, 600, orientation=6)
+    assert _downscale(data, 1536) is data
+
+
+def test_downscale_passes_through_unreadable_data():
+    assert _downscale(b"not an image", 1536) == b"not an image"
+
+
+def test_sink_falls_back_to_pil_when_header_is_unreadable():
+    data = _jpeg(3000, 1500)
+    sink = _Base64Sink(1536)
+    # A first chunk too short to hold the frame header
+    sink.write(data[:4])
+    sink.write(data[4:])
+
+    assert sink.buffered
+    with Image.open(io.BytesIO(base64.b64decode(sink.finish()))) as img:
+        assert img.size == (1536, 768)
+
+
+def test_sink_streams_images_within_the_limit():
+    data = _jpeg(800, 600)
+    sink = _Base64Sink(1536)
+    sink.write(data)
+
+    assert not sink.buffered
+    assert base64.b64decode(sink.finish()) == data
@@ -0,0 +1,51 @@
+"""Tests for the queued logging setup."""
+
+import logging
+import os
+
+import pytest
+
+from src.utils import logging as logging_utils
+from src.utils.logging import setup_logging, stop_logging
+
+
+@pytest.fixture
+def file_handler(tmp_path):
+    """Set up logging, then point the listener at a file the test can read."""
+    path = tmp_path / "app.log"
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    setup_logging(json_format=False)
+    logging_utils._listener.handlers = (handler,)
+    yield path
+    stop_logging()
+    for h in logging.getLogger().handlers[:]:
+        logging.getLogger().removeHandler(h)
+    handler.close()
+
+
+def test_stop_logging_restores_real_handlers(file_handler):
+    logger = logging.getLogger("test.queue")
+    logger.warning("before stop")
+    stop_logging()
+
+    root_handlers = logging.getLogger().handlers
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in root_handlers)
+    logger.warning("after stop")
+    assert file_handler.read_text().splitlines() == ["before stop", "after stop"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_child_gets_a_working_listener(file_handler):
+    pid = os.fork()
+    if pid == 0:
+        written = False
+        try:
+            logging.getLogger("test.queue").warning("from child")
+            # Flushes only if the child has a live listener of its own
+            stop_logging()
+            written = "from child" in file_handler.read_text()
+        finally:
+            os._exit(0 if written else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
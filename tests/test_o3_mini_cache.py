@@ -0,0 +1,28 @@
+"""Tests for the o3-mini response cache."""
+
+import asyncio
+
+from src.services import o3_mini_client
+from src.services.o3_mini_client import COMPLETION_CACHE_PREFIX, O3MiniClient
+
+
+class FakeRedis:
+    def __init__(self, values):
+        self.values = values
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def test_unreadable_redis_entry_is_dropped_as_a_miss(monkeypatch):
+    client = O3MiniClient()
+    client.deployment = "o3-mini"
+    key = client._cache_key("system", "user", None)
+    redis = FakeRedis({COMPLETION_CACHE_PREFIX + key: b'{"content": "trunc'})
+    monkeypatch.setattr(o3_mini_client, "get_redis", lambda: redis)
+
+    assert asyncio.run(client._cache_get(key)) is None
+    assert redis.values == {}
@@ -0,0 +1,122 @@
+"""Tests for text onboarding turns."""
+
+import asyncio
+
+from src.services import onboarding_service
+from src.services.onboarding_service import OnboardingService
+
+
+class FakeO3Client:
+    enabled = True
+
+    def __init__(self, result):
+        self.result = result
+
+    async def generate_completion(self, system_prompt, user_prompt, response_format=None, cache=False):
+        return self.result
+
+
+def _turn_result(**profile):
+    """A result shaped like OnboardingTurnResponse, with empty defaults."""
+    fields = {
+        "company_name": "",
+        "industry": "",
+        "team_size": "",
+        "brand_name": "",
+        "voice_tone": "",
+        "logo_status": "",
+        "palette_preference": "",
+        "target_audience_tags": [],
+        "marketing_objective": "",
+        "ideal_customer_description": "",
+        "aesthetic_style": "",
+    }
+    fields.update(profile)
+    return {
+        "ai_message": "Thanks! What should we call your brand?",
+        "current_page": 1,
+        "profile": fields,
+        "ui_state": {
+            "highlight_fields": [],
+            "suggested_options": [],
+            "page_completed": False,
+            "missing_required_fields": [],
+        },
+        "onboarding_completed": False,
+    }
+
+
+def _run_turns(results):
+    service = OnboardingService()
+    session_id, _ = asyncio.run(service.start_session())
+    for result in results:
+        service.o3_client = FakeO3Client(result)
+        reply, profile, complete = asyncio.run(service.process_turn(session_id, "hello"))
+    return reply, profile, complete
+
+
+def test_schema_shaped_result_populates_the_profile():
+    reply, profile, complete = _run_turns([
+        _turn_result(
+            company_name="Adire House",
+            industry="Fashion",
+            team_size="2-10",
+            voice_tone="Playful",
+            target_audience_tags=["Gen Z", "Students"],
+            aesthetic_style="Bold",
+        ),
+    ])
+
+    assert reply.text == "Thanks! What should we call your brand?"
+    assert profile.business_name == "Adire House"
+    assert profile.industry == "Fashion"
+    assert profile.team_size == "2-10"
+    assert profile.brand_voice == "Playful"
+    assert profile.target_audience_tags == ["Gen Z", "Students"]
+    assert profile.aesthetic_style == "Bold"
+    # Fields the model left empty stay unset
+    assert profile.brand_name is None
+    assert not complete and not profile.onboarding_completed
+
+
+def test_later_turns_merge_into_the_profile():
+    final = _turn_result(
+        brand_name="Adire",
+        target_audience_tags=["Students", "Parents"],
+    )
+    final["onboarding_completed"] = True
+    _, profile, complete = _run_turns([
+        _turn_result(company_name="Adire House", target_audience_tags=["Gen Z", "Students"]),
+        final,
+    ])
+
+    assert profile.business_name == "Adire House"
+    assert profile.brand_name == "Adire"
+    assert profile.target_audience_tags == ["Gen Z", "Students", "Parents"]
+    assert complete and profile.onboarding_completed
+
+
+class FakeRedis:
+    def __init__(self, values):
+        self.values = values
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.values[key] = value
+
+
+def test_unreadable_redis_session_is_treated_as_a_miss(monkeypatch):
+    redis = FakeRedis({})
+    monkeypatch.setattr(onboarding_service, "get_redis", lambda: redis)
+    service = OnboardingService()
+    session_id, _ = asyncio.run(service.start_session())
+
+    key = onboarding_service.SESSION_KEY_PREFIX + session_id
+    assert key.startswith("kratorai:onb:v1:") and key in redis.values
+    redis.values[key] = b'{"session_id": "truncated'
+
+    # Falls back to the local copy instead of raising
+    session = asyncio.run(service.get_session(session_id))
+    assert session.session_id == session_id
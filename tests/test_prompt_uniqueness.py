@@ -0,0 +1,66 @@
+"""Tests that prompt definitions and question phrasings are not duplicated."""
+
+import ast
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from src.prompts.voice_prompts import (
+    FIRST_QUESTION_TEMPLATES,
+    QUESTION_TEMPLATES,
+    first_question,
+    pick_question,
+)
+
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "src" / "prompts"
+
+
+def _top_level_names(path: Path) -> list[str]:
+    names = []
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Assign):
+            names.extend(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names.append(node.target.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.append(node.name)
+    return names
+
+
+def test_prompt_modules_define_each_name_once():
+    names = Counter()
+    for path in sorted(PROMPTS_DIR.glob("*.py")):
+        names.update(_top_level_names(path))
+
+    assert names, "no prompt modules found"
+    assert [name for name, count in names.items() if count > 1] == []
+
+
+@pytest.mark.parametrize(
+    "templates",
+    [*FIRST_QUESTION_TEMPLATES.values(), *QUESTION_TEMPLATES.values()],
+)
+def test_question_templates_have_no_duplicates(templates):
+    assert isinstance(templates, tuple)
+    assert len(set(templates)) == len(templates)
+
+
+@pytest.mark.parametrize("intent", sorted(FIRST_QUESTION_TEMPLATES))
+def test_first_question_cycles_through_every_phrasing(intent):
+    templates = FIRST_QUESTION_TEMPLATES[intent]
+
+    # The rotation is shared state, so start wherever it is and take one lap
+    lap = [first_question(intent) for _ in templates]
+    assert sorted(lap) == sorted(templates)
+    assert first_question("unknown") is None
+
+
+@pytest.mark.parametrize("field", sorted(QUESTION_TEMPLATES))
+def test_pick_question_cycles_through_every_phrasing(field):
+    templates = QUESTION_TEMPLATES[field]
+
+    picks = [pick_question(field, seed) for seed in range(len(templates))]
+    assert picks == list(templates)
+    assert pick_question(field, len(templates)) == templates[0]
+    assert pick_question("unknown", 0) is None
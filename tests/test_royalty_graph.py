@@ -0,0 +1,45 @@
+"""Tests for royalty share propagation."""
+
+import networkx as nx
+import pytest
+
+from src.lineage.royalty_graph import RoyaltyGraph
+
+
+@pytest.fixture
+def graph():
+    """Two founders bred through two generations, plus a near-zero contribution."""
+    g = RoyaltyGraph()
+    g.add_design("a", "alice")
+    g.add_design("b", "bob")
+    g.add_design("c", "carol")
+    g.add_design("ab", "dana", is_original=False)
+    g.add_breeding_relationship("a", "ab", 0.6)
+    g.add_breeding_relationship("b", "ab", 0.4)
+    g.add_design("abc", "erin", is_original=False)
+    g.add_breeding_relationship("ab", "abc", 1.0)
+    g.add_breeding_relationship("c", "abc", 1e-12)
+    return g
+
+
+def test_batch_shares_match_exact_single_design_shares(graph):
+    designs = ["ab", "abc"]
+    batch = graph.compute_all_propagated_shares(designs)
+
+    for design_id in designs:
+        exact = graph.compute_propagated_shares(design_id, epsilon=0.0)
+        assert batch[design_id].keys() == exact.keys()
+        for owner_id, share in exact.items():
+            assert batch[design_id][owner_id] == pytest.approx(share)
+
+
+def test_batch_shares_keep_owners_below_the_default_epsilon(graph):
+    assert "carol" not in graph.compute_propagated_shares("abc")
+    assert "carol" in graph.compute_all_propagated_shares(["abc"])["abc"]
+
+
+def test_unknown_design_raises_networkx_error(graph):
+    with pytest.raises(nx.NetworkXError):
+        graph.compute_propagated_shares("missing")
+    with pytest.raises(nx.NetworkXError):
+        graph.compute_all_propagated_shares(["ab", "missing"])
@@ -0,0 +1,45 @@
+"""Tests for the voice conversation system prompt."""
+
+import importlib
+import re
+
+import pytest
+
+from src.prompts import constants, voice_prompts
+
+
+@pytest.fixture
+def reload_prompts(monkeypatch):
+    """Reload voice_prompts against patched limits, restoring it afterwards."""
+    def _reload(**limits):
+        for name, value in limits.items():
+            monkeypatch.setattr(constants, name, value)
+        return importlib.reload(voice_prompts)
+    yield _reload
+    monkeypatch.undo()
+    importlib.reload(voice_prompts)
+
+
+def test_json_example_has_a_single_confidence_field():
+    assert voice_prompts.VOICE_CONVERSATION_SYSTEM_PROMPT.count('"confidence"') == 1
+
+
+def test_prompt_states_the_configured_limits():
+    prompt = voice_prompts.VOICE_CONVERSATION_SYSTEM_PROMPT
+
+    assert f"Maximum {constants.MAX_CONVERSATION_TURNS} conversation turns" in prompt
+    assert f"Maximum {constants.MAX_CONVERSATION_TURNS} turns total" in prompt
+    assert f"more than {constants.MAX_REPETITIVE_QUESTIONS} times" in prompt
+
+
+def test_limits_are_interpolated_not_hard_coded(reload_prompts):
+    prompt = reload_prompts(
+        MAX_CONVERSATION_TURNS=11,
+        MAX_REPETITIVE_QUESTIONS=13,
+    ).VOICE_CONVERSATION_SYSTEM_PROMPT
+
+    # Every count in the prompt follows the constants; no stale literal remains
+    turn_counts = re.findall(r"Maximum (\d+) (?:conversation )?turns", prompt)
+    repeat_counts = re.findall(r"(?:more than|limit:) (\d+) times", prompt)
+    assert turn_counts == ["11", "11"]
+    assert repeat_counts == ["13", "13", "13"]